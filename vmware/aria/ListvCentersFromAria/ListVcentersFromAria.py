@@ -1,42 +1,25 @@
-import requests
 import urllib3
 from os import path
 import sys
 import argparse
 
-class AriaOperationsAPI():
+# The shared Aria Operations client lives in vmware/aria
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), ".."))
+from ariaops import AriaOpsSession, TokenCache
 
-    def __init__(self, host, username, password, domain, verify_ssl=False):
-        self.url = f"https://{host}"
-        self.username = username
-        self.password = password
+class AriaOperationsAPI(AriaOpsSession):
+
+    def __init__(self, host, username, password, domain, verify_ssl=False, token_cache=None):
+        super().__init__(host, username, password, domain, verify_ssl, token_cache=token_cache)
         self.domain = domain
-        self.verify_ssl = verify_ssl
-        self.token = None
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         
     def get_token(self):
-        try:
-            auth_url = f"{self.url}/suite-api/api/auth/token/acquire"
-            json = {"username": self.username, "authSource" : self.domain, "password": self.password}
-            headers = {"Content-Type": "application/json", "Accept": "application/json" }
-
-            response = requests.post(url=auth_url, json=json, headers=headers, verify=self.verify_ssl)
-
-            if response.status_code == 200:
-                self.token = response.json().get("token")
-                return True
-            else:
-                return False
-        except Exception as e:
-            print(e)
-            return False
+        return self.acquire_token()
     
     def get_vcenter_adapters(self):
         try:
-            adapter_kind_url = f"{self.url}/suite-api/api/adapterkinds"
-            headers = { "Authorization": f"OpsToken {self.token}", "Accept": "application/json" }
-            response = requests.get(url=adapter_kind_url,headers=headers,verify=self.verify_ssl)
+            response = self.get("adapterkinds")
             if response.status_code == 200:
                 adapters_kind = response.json().get("adapter-kind", [])
                 for adapter in adapters_kind:
@@ -44,9 +27,8 @@ class AriaOperationsAPI():
                         vcenter_adapter_kind = adapter.get("key")
                         break
                 
-            adapter_url = f"{self.url}/suite-api/api/adapters"
             params = {"adapterKindKey": vcenter_adapter_kind}
-            response2 = requests.get(url=adapter_url,headers=headers,params=params,verify=self.verify_ssl)
+            response2 = self.get("adapters", params=params)
             if response2.status_code == 200:
                 adapters = response2.json().get("adapterInstancesInfoDto", [])
                 return adapters
@@ -88,6 +70,8 @@ def main():
     parser.add_argument("--password", required=True, help="Password for authentication")
     parser.add_argument("--insecure", action="store_true", help="Skip SSL verification")
     parser.add_argument("--output", required=True, help="Output file")
+    parser.add_argument("--token-cache", action="store_true", help="Reuse a valid token from earlier runs instead of logging in every time")
+    parser.add_argument("--token-cache-file", help="Token cache file used by --token-cache")
     
     args = parser.parse_args()
     
@@ -96,7 +80,8 @@ def main():
         username = args.username,
         password = args.password,
         domain = args.domain,
-        verify_ssl = not args.insecure
+        verify_ssl = not args.insecure,
+        token_cache = TokenCache(args.token_cache_file) if args.token_cache else None
     )
     
     if not client.get_token():
@@ -0,0 +1,28 @@
+"""
+Shared Aria Operations client used by the Aria and VCF scripts
+
+Scripts outside vmware/aria add that directory to sys.path before importing the package.
+"""
+from ariaops.client import (
+    AriaOpsSession,
+    create_session,
+    DEFAULT_BACKOFF,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RENEW_MARGIN,
+    DEFAULT_RETRIES,
+)
+from ariaops.json_stream import iter_json_array, DEFAULT_CHUNK_SIZE
+from ariaops.token_cache import TokenCache, default_cache_file
+
+__all__ = [
+    "AriaOpsSession",
+    "create_session",
+    "DEFAULT_BACKOFF",
+    "DEFAULT_POOL_SIZE",
+    "DEFAULT_RENEW_MARGIN",
+    "DEFAULT_RETRIES",
+    "iter_json_array",
+    "DEFAULT_CHUNK_SIZE",
+    "TokenCache",
+    "default_cache_file",
+]
@@ -0,0 +1,159 @@
+"""
+Pooled, authenticated session against the Aria Operations suite-api
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+                        requests
+"""
+from typing import Optional, Tuple
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ariaops.token_cache import TokenCache
+
+# Connections kept alive per host
+DEFAULT_POOL_SIZE = 10
+# Retries of a request answered with 429 or 503, waiting backoff * 2^n seconds between them
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+# Seconds before expiry at which the token is renewed
+DEFAULT_RENEW_MARGIN = 300
+# Token lifetime assumed when the server does not report one
+DEFAULT_TOKEN_LIFETIME = 6 * 3600
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF) -> requests.Session:
+    """Create a keep-alive session that accepts gzip and retries 429/503 responses with backoff.
+
+    Connection and read errors are not retried, an unreachable server fails at once.
+    """
+    retry = Retry(
+        total=None,
+        connect=0,
+        read=0,
+        other=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 503),
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+class AriaOpsSession:
+    """Authenticated session for the Aria Operations suite-api.
+
+    The token is acquired on first use and renewed shortly before it expires,
+    so long runs never send an expired token. A 401 answer triggers one new login.
+    With a token_cache, a valid token left by an earlier process is reused
+    without logging in.
+    """
+
+    def __init__(self, host: str, username: str, password: str, auth_source: str, verify_ssl: bool = True,
+                 pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 renew_margin: float = DEFAULT_RENEW_MARGIN, token_cache: Optional[TokenCache] = None):
+        self.host = host.rstrip('/')
+        # A full url (http://127.0.0.1:8443) is accepted for test servers
+        self.url = self.host if '://' in self.host else f"https://{self.host}"
+        self.username = username
+        self.password = password
+        self.auth_source = auth_source
+        self.verify_ssl = verify_ssl
+        self.renew_margin = renew_margin
+        self.token_cache = token_cache
+        self._cache_key = TokenCache.make_key(self.url, username, auth_source)
+        self.token: Optional[str] = None
+        self.token_expires = 0.0
+        # renew_margin, shortened for tokens that live less than twice as long
+        self._token_margin = renew_margin
+        self.session = create_session(pool_size, retries, backoff)
+        self.session.verify = verify_ssl
+        self._token_lock = threading.Lock()
+
+    def _login(self) -> Optional[Tuple[str, float]]:
+        """Log in and return the new token and its expiry time, or None when the login is refused or fails."""
+        try:
+            auth_url = f"{self.url}/suite-api/api/auth/token/acquire"
+            json = {"username": self.username, "authSource": self.auth_source, "password": self.password}
+            response = self.session.post(auth_url, json=json, headers={"Content-Type": "application/json"})
+
+            if response.status_code != 200:
+                return None
+
+            data = response.json()
+            token = data.get("token")
+            # validity is the expiry time in epoch milliseconds
+            validity = data.get("validity")
+            expires = validity / 1000 if validity else time.time() + DEFAULT_TOKEN_LIFETIME
+            return (token, expires) if token else None
+        except Exception as e:
+            print(e)
+            return None
+
+    def acquire_token(self) -> bool:
+        """Store a token, from the token cache when it holds a valid one, otherwise by logging in.
+
+        Returns False when the login is refused or fails.
+        """
+        if self.token_cache is not None:
+            result = self.token_cache.get_or_acquire(self._cache_key, self.renew_margin, self._login)
+        else:
+            result = self._login()
+
+        if result is None:
+            return False
+        self.token, self.token_expires = result
+        lifetime = max(0.0, self.token_expires - time.time())
+        self._token_margin = min(self.renew_margin, lifetime / 2)
+        return True
+
+    def ensure_token(self):
+        """Acquire or renew the token when it is missing or about to expire."""
+        with self._token_lock:
+            if self.token is None or time.time() >= self.token_expires - self._token_margin:
+                if not self.acquire_token():
+                    raise requests.exceptions.RequestException("Could not acquire an Aria Operations token")
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send an authenticated request to suite-api/api/<path>."""
+        self.ensure_token()
+        url = f"{self.url}/suite-api/api/{path.lstrip('/')}"
+        headers = dict(kwargs.pop("headers", None) or {})
+
+        token = self.token
+        headers["Authorization"] = f"OpsToken {token}"
+        response = self.session.request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 401:
+            # The token was revoked or expired early, log in again once
+            response.close()
+            with self._token_lock:
+                if self.token == token:
+                    if self.token_cache is not None:
+                        self.token_cache.invalidate(self._cache_key, token)
+                    if not self.acquire_token():
+                        return response
+            headers["Authorization"] = f"OpsToken {self.token}"
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
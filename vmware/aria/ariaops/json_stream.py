@@ -0,0 +1,111 @@
+"""
+Incremental parsing of large suite-api list responses
+
+iter_json_array reads a JSON object from a stream of byte chunks, such as
+requests' Response.iter_content(), and yields the elements of one of its
+top level arrays as soon as each one is complete. Only the element being
+parsed is kept in memory, not the whole body or the whole list.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from typing import Any, Iterable, Iterator, Optional
+import codecs
+import json
+import re
+
+# Bytes requested per read of a streamed response
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text buffer over a stream of byte chunks, parsed from left to right."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, returning False at the end of the stream."""
+        if self.eof:
+            return False
+        # Drop the consumed text so the buffer stays the size of one element
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or an empty string at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self._fill():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the response")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Parse the next complete JSON value, reading more chunks while it is cut off."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str, members: Optional[dict] = None) -> Iterator[Any]:
+    """Yield the elements of the top level array `key` of a streamed JSON object.
+
+    The other top level members are parsed whole and stored in members when it
+    is given, so small fields such as pageInfo are still available once the
+    generator is exhausted.
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.peek() == "]":
+                        reader.pos += 1
+                        break
+                    reader.expect(",")
+        else:
+            value = reader.value()
+            if members is not None:
+                members[name] = value
+
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
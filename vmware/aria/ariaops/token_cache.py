@@ -0,0 +1,110 @@
+"""
+On-disk cache of Aria Operations tokens shared between processes
+
+Tokens are stored with their expiry time in a JSON file readable only by the
+current user (directory 0700, file 0600), keyed by a hash of host, user and
+auth source. A lock file serializes access, so concurrent processes reuse one
+login instead of each acquiring a token. On Windows the file permissions are
+inherited from the user profile directory.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from contextlib import contextmanager
+from os import path
+from typing import Callable, Optional, Tuple
+import hashlib
+import json
+import os
+import time
+
+if os.name == 'nt':
+    import msvcrt
+    fcntl = None
+else:
+    import fcntl
+    msvcrt = None
+
+
+def default_cache_file() -> str:
+    """Return the per-user token cache location."""
+    if os.name == 'nt':
+        base = os.environ.get("LOCALAPPDATA") or path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or path.join(path.expanduser("~"), ".cache")
+    return path.join(base, "ariaops", "tokens.json")
+
+
+class TokenCache:
+    """Permission restricted token cache shared safely between processes."""
+
+    def __init__(self, cache_file: Optional[str] = None):
+        self.cache_file = cache_file or default_cache_file()
+        self.lock_file = self.cache_file + ".lock"
+        os.makedirs(path.dirname(path.abspath(self.cache_file)), mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def make_key(host: str, username: str, auth_source: str) -> str:
+        return hashlib.sha256(f"{host.lower()}\0{username}\0{auth_source or ''}".encode()).hexdigest()
+
+    @contextmanager
+    def _locked(self):
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if msvcrt is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: dict):
+        # Drop expired tokens and replace the file atomically
+        now = time.time()
+        entries = {key: entry for key, entry in entries.items() if entry.get("expires", 0) > now}
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(temp_file, self.cache_file)
+
+    def get_or_acquire(self, key: str, margin: float, acquire: Callable[[], Optional[Tuple[str, float]]]) -> Optional[Tuple[str, float]]:
+        """Return a cached (token, expires) valid for at least margin seconds, or call acquire and cache its result.
+
+        The cache stays locked while acquire runs, so concurrent processes wait for
+        one login and then reuse its token.
+        """
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key)
+            if entry and entry.get("expires", 0) - margin > time.time():
+                return entry["token"], entry["expires"]
+
+            result = acquire()
+            if result is not None:
+                token, expires = result
+                entries[key] = {"token": token, "expires": expires}
+                self._write(entries)
+            return result
+
+    def invalidate(self, key: str, token: str):
+        """Forget a token the server refused, unless another process already replaced it."""
+        with self._locked():
+            entries = self._read()
+            if entries.get(key, {}).get("token") == token:
+                del entries[key]
+                self._write(entries)
@@ -10,21 +10,50 @@ VERSION 1.1
 """
 from colorama import Fore, Style, init
 from tabulate import tabulate
-from collections import defaultdict
-from typing import Dict, List, Optional
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urljoin
 from os import path
-from os import name as osname
 import getpass
-import csv
 import json
-import re
 import argparse
+import atexit
 import sys
+import threading
+import time
 import requests
 
+# The shared Aria Operations client lives in vmware/aria
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "..", "aria"))
+from ariaops import AriaOpsSession, create_session, default_cache_file, iter_json_array, TokenCache, DEFAULT_CHUNK_SIZE, DEFAULT_POOL_SIZE
+from bcg_checkpoint import RunCheckpoint, default_checkpoint_file, DEFAULT_CHECKPOINT_INTERVAL
+from bcg_cache import CompatibilityCache, DEFAULT_CACHE_FILE, DEFAULT_CACHE_TTL
+from bcg_export import EXPORTERS, create_exporter
+from bcg_report import aggregate_results, model_rows, HostRecord, VCF9, NOT_COMPATIBLE, NOT_FOUND, NOT_APPLIED, LOOKUP_ERROR
+from bcg_mirror import GuideMirror, DEFAULT_MIRROR_FILE
+from bcg_profile import Profiler, profile_stage
+from bcg_matcher import CpuSeriesIndex, cpu_series_key, wanted_series_keys
+from bcg_snapshot import InventorySnapshot, DEFAULT_SNAPSHOT_FILE, DEFAULT_SNAPSHOT_MAX_AGE
+
 init(autoreset=True)
 
+# Number of resources requested per bulk properties call
+DEFAULT_BATCH_SIZE = 100
+# Number of property requests in flight at the same time
+DEFAULT_WORKERS = 1
+# Number of resources requested per page when enumerating hosts
+DEFAULT_PAGE_SIZE = 1000
+# The only host properties the check needs
+HOST_PROPERTY_KEYS = ("hardware|vendor", "hardware|vendorModel", "cpu|cpuModel")
+# Number of compatibility guide lookups in flight and the maximum requests per second
+DEFAULT_GUIDE_WORKERS = 4
+DEFAULT_GUIDE_RATE = 5.0
+DEFAULT_GUIDE_URL = "https://compatibilityguide.broadcom.com/compguide/programs/viewResults"
+# Number of compatibility guide listings requested per page
+DEFAULT_GUIDE_PAGE_SIZE = 100
+
 def _print_banner(version):
     banner = r"""
  __     ______ _____    ___   ___                               
@@ -49,122 +78,476 @@ def _print_banner(version):
     print('-' * len(text))
     print("\n")
 
-class AriaOpsClient:
+class AriaOpsClient(AriaOpsSession):
     """Client for interacting with Aria Operations API."""
     
-    def __init__(self, host: str, username: str, domain: str, password: str, verify_ssl: bool = True):
-        self.host = host.rstrip('/')
-        self.url = f"https://{self.host}"
-        self.session = requests.Session()
-        self.verify_ssl = verify_ssl
-        self.token = None
-        self.username = username
+    def __init__(self, host: str, username: str, domain: str, password: str, verify_ssl: bool = True, workers: int = DEFAULT_WORKERS,
+                 token_cache: Optional[TokenCache] = None):
+        # Keep one pooled connection per worker so parallel requests reuse their TLS sessions
+        super().__init__(host, username, password, domain, verify_ssl, pool_size=max(workers, DEFAULT_POOL_SIZE), token_cache=token_cache)
+        self.workers = max(1, workers)
         self.domain = domain
-        self.password = password
+        # Cleared when the instance does not offer the latest properties query
+        self.property_query = True
+        # False once a page of hosts could not be retrieved, the inventory is then partial
+        self.inventory_complete = True
+        # Busy time of the page and property requests is recorded when set
+        self.profiler: Optional[Profiler] = None
     
     def authenticate(self):
-        try:
-            auth_url = f"{self.url}/suite-api/api/auth/token/acquire"
-            json = {"username": self.username, "authSource" : self.domain, "password": self.password}
-            headers = {"Content-Type": "application/json", "Accept": "application/json" }
-
-            response = requests.post(url=auth_url, json=json, headers=headers, verify=self.verify_ssl)
-
-            if response.status_code == 200:
-                self.token = response.json().get("token")
-                return True
-            else:
-                return False
-        except Exception as e:
-            print(e)
-            return False
+        return self.acquire_token()
+    
+    def _get_hosts_page(self, page: int, page_size: int) -> Dict:
+        """Retrieve one page of ESXi hosts from Aria Operations.
+        
+        The response is parsed as it streams in and only the identifier and name
+        of each host are kept.
+        """
+        params = {"page": page, "pageSize": page_size, "resourceKind": "hostSystem", "_no_links": "true"}
+        with profile_stage(self.profiler, "host pages"), self.get("resources", params=params, stream=True) as response:
+            response.raise_for_status()
+            members = {}
+            resources = [
+                {"identifier": resource.get('identifier'), "resourceKey": {"name": resource.get('resourceKey', {}).get('name', 'Unknown')}}
+                for resource in iter_json_array(response.iter_content(DEFAULT_CHUNK_SIZE), "resourceList", members)
+            ]
+        return {"resourceList": resources, "pageInfo": members.get('pageInfo', {})}
+    
+    def iter_hosts(self, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+        """Yield every ESXi host from Aria Operations, walking all result pages.
+        
+        The next page is requested in the background while the current one is consumed.
+        When a page fails, the walk stops and inventory_complete is set to False.
+        """
+        self.inventory_complete = True
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 0
+            seen = 0
+            served_page_size = None
+            future = prefetcher.submit(self._get_hosts_page, page, page_size)
+            while future is not None:
+                try:
+                    data = future.result()
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    print(f"{Fore.RED}[-] Error retrieving hosts of {self.host} (page {page}): {e}")
+                    self.inventory_complete = False
+                    return
+                
+                resources = data.get('resourceList', [])
+                page_info = data.get('pageInfo', {})
+                total_count = page_info.get('totalCount', 0)
+                if served_page_size is None:
+                    # A server capping the page size without reporting it serves fewer hosts than asked
+                    served_page_size = page_info.get('pageSize') or len(resources) or page_size
+                
+                # Count the hosts actually served, the walk stops only once every host was received
+                seen += len(resources)
+                future = None
+                if resources and seen < total_count:
+                    page = seen // served_page_size
+                    future = prefetcher.submit(self._get_hosts_page, page, served_page_size)
+                
+                yield from resources
     
     def get_all_hosts(self) -> List[Dict]:
         """Retrieve all ESXi hosts from Aria Operations."""
-        resources_url = f"{self.url}/suite-api/api/resources?page=0&pageSize=1000&resourceKind=hostSystem&_no_links=true"
-        headers = {
-            "Authorization": f"vRealizeOpsToken {self.token}",
-            "Accept": "application/json"
-        }
-        try:
-            response = self.session.get(resources_url,headers=headers, verify=self.verify_ssl)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('resourceList', [])
-        except requests.exceptions.RequestException as e:
-            print(f"[-] Error retrieving hosts: {e}")
-            return []
+        return list(self.iter_hosts())
     
     def get_resource_properties(self, resource_id: str) -> Dict:
         """Get properties for a specific resource."""
-        properties_url = f"{self.url}/suite-api/api/resources/{resource_id}/properties?_no_links=true"
-        headers = {
-            "Authorization": f"vRealizeOpsToken {self.token}",
-            "Accept": "application/json"
-        }
-        
         try:
-            response = self.session.get(properties_url, headers=headers, verify=self.verify_ssl)
+            response = self.get(f"resources/{resource_id}/properties", params={"_no_links": "true"})
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"[-] Error retrieving properties for {resource_id}: {e}")
             return {}
     
-    def extract_server_models(self, hosts: List[Dict], verbose: bool = False) -> Dict[str, List[str]]:
-        """Extract server models and their hostnames from host data."""
-        servers = defaultdict(list)
-        server_models = defaultdict(list)
+    def query_resource_properties(self, resource_ids: List[str], property_keys: Iterable[str] = HOST_PROPERTY_KEYS) -> Optional[Dict[str, List[Dict]]]:
+        """Get only the given properties of many resources through the latest properties query.
         
-        for host in hosts:
-            resource_id = host.get('identifier')
-            host_name = host.get('resourceKey', {}).get('name', 'Unknown')
+        Returns None, and stops using the query, when the instance does not support it.
+        """
+        body = {"resourceIds": resource_ids, "propertyKeys": list(property_keys), "instanced": False}
+        with self.post("resources/properties/latest/query", json=body, params={"_no_links": "true"}, stream=True) as response:
+            if response.status_code in (400, 404, 405, 501):
+                print(f"{Fore.YELLOW}[-] {self.host} does not support the latest properties query, requesting all properties instead")
+                self.property_query = False
+                return None
+            response.raise_for_status()
+            
+            properties = {}
+            for entry in iter_json_array(response.iter_content(DEFAULT_CHUNK_SIZE), "values"):
+                property_list = []
+                for content in entry.get('property-contents', {}).get('property-content', []):
+                    values = content.get('values') or content.get('data') or []
+                    if values:
+                        property_list.append({"name": content.get('statKey'), "value": values[-1]})
+                properties[entry.get('resourceId')] = property_list
+        return properties
+    
+    def get_bulk_resource_properties(self, resource_ids: List[str]) -> Optional[Dict[str, List[Dict]]]:
+        """Get the host properties of many resources in a single request.
+        
+        Only HOST_PROPERTY_KEYS are requested when the instance supports it,
+        otherwise every property is downloaded, parsed as it streams in and
+        filtered down to HOST_PROPERTY_KEYS.
+        """
+        try:
+            if self.property_query:
+                properties = self.query_resource_properties(resource_ids)
+                if properties is not None:
+                    return properties
             
-            if verbose:
-                print(f"[*] Processing host: {host_name}")
+            params = [("resourceId", resource_id) for resource_id in resource_ids]
+            params.append(("_no_links", "true"))
+            with self.get("resources/properties", params=params, stream=True) as response:
+                response.raise_for_status()
+                properties = {}
+                for entry in iter_json_array(response.iter_content(DEFAULT_CHUNK_SIZE), "resourcePropertiesList"):
+                    properties[entry.get('resourceId')] = [prop for prop in entry.get('property', []) if prop.get('name') in HOST_PROPERTY_KEYS]
+            return properties
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"[-] Bulk property request failed for {len(resource_ids)} hosts, falling back to per-host requests: {e}")
+            return None
+    
+    @staticmethod
+    def _parse_host_properties(property_list: List[Dict]):
+        """Return the vendor, hardware model and CPU model found in a property list."""
+        vendor = None
+        hardware_model = None
+        cpu_model = None
+        
+        # Look for hardware model information
+        # cpu|cpuModel
+        # hardware|vendorModel
+        # hardware|vendor
+        for prop in property_list:
+            prop_name = prop.get('name', '')
             
-            # Get detailed properties
-            properties = self.get_resource_properties(resource_id)
-            property_list = properties.get('property', [])
+            if prop_name == 'hardware|vendorModel':
+                hardware_model = prop.get('value')
+            elif prop_name == 'hardware|vendor':
+                vendor = prop.get('value')
+            elif prop_name == 'cpu|cpuModel':
+                cpu_model = prop.get('value')
             
-            # Look for hardware model information
-            # cpu|cpuModel
-            # hardware|vendorModel
-            # hardware|vendor
+            if hardware_model and cpu_model and vendor:
+                break
+        
+        return vendor or 'Unknown', hardware_model or 'Unknown', cpu_model or 'Unknown'
+    
+    def _fetch_batch_properties(self, batch: List[Dict], use_bulk: bool) -> List[Optional[List[Dict]]]:
+        """Return the property list of each host in batch, in the same order. Failed hosts are None.
+
+        Hosts missing from the bulk response are requested one by one.
+        """
+        with profile_stage(self.profiler, "host properties"):
+            return self._request_batch_properties(batch, use_bulk)
+    
+    def _request_batch_properties(self, batch: List[Dict], use_bulk: bool) -> List[Optional[List[Dict]]]:
+        bulk_properties = None
+        if use_bulk:
+            bulk_properties = self.get_bulk_resource_properties([host.get('identifier') for host in batch])
+
+        results = []
+        for host in batch:
+            resource_id = host.get('identifier')
+            if bulk_properties is not None and resource_id in bulk_properties:
+                results.append(bulk_properties[resource_id])
+                continue
             
-            hardware_model = False
-            cpu_model = False
-            for prop in property_list:
-                prop_name = prop.get('name', '')
-                
-                if 'hardware|vendorModel' in prop_name:
-                    hardware_model = prop.get('value')
-                if 'hardware|vendor' in prop_name:
-                    vendor = prop.get('value')
-                if 'cpu|cpuModel' in prop_name:
-                    cpu_model = prop.get('value')
-                
-                if hardware_model and cpu_model and vendor:
-                    break
+            try:
+                properties = self.get_resource_properties(resource_id)
+            except Exception as e:
+                print(f"[-] Error retrieving properties for {resource_id}: {e}")
+                properties = {}
+            results.append(properties.get('property', []) if properties else None)
+        return results
+    
+    def _fetch_batch_records(self, batch: List[Dict], use_bulk: bool, snapshot: Optional[InventorySnapshot] = None,
+                             checkpoint: Optional[RunCheckpoint] = None) -> List[Optional[tuple]]:
+        """Return (vendor, model, cpu, fetched) for each host in batch, in the same order. Failed hosts are None.
+        
+        Hosts fetched before an interrupted run was resumed, or that the snapshot
+        can vouch for, are not requested again.
+        """
+        records = [None] * len(batch)
+        missing = []
+        for position, host in enumerate(batch):
+            resource_id = host.get('identifier')
+            host_name = host.get('resourceKey', {}).get('name', 'Unknown')
+            if checkpoint is not None:
+                resumed = checkpoint.reusable(self.host, resource_id, host_name)
+                if resumed is not None:
+                    records[position] = (*resumed, True)
+                    continue
+            reused = None
+            if snapshot is not None:
+                reused = snapshot.reusable(resource_id, host_name)
+            if reused is not None:
+                records[position] = (*reused, False)
+            else:
+                missing.append(position)
+        
+        if missing:
+            property_lists = self._fetch_batch_properties([batch[position] for position in missing], use_bulk)
+            for position, property_list in zip(missing, property_lists):
+                if property_list is not None:
+                    records[position] = (*self._parse_host_properties(property_list), True)
+        return records
+    
+    @staticmethod
+    def _iter_batches(hosts: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+        iterator = iter(hosts)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def extract_server_models(self, hosts: Iterable[Dict], verbose: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, snapshot: Optional[InventorySnapshot] = None,
+                              on_host: Optional[Callable[[str, str], None]] = None, checkpoint: Optional[RunCheckpoint] = None) -> Tuple[Dict[str, List[HostRecord]], Dict[str, List[HostRecord]]]:
+        """Extract server models and their hostnames from host data.
+        
+        Hosts may be any iterable, such as iter_hosts(), and are consumed as they
+        arrive. Properties are requested for `batch_size` hosts at a time through
+        the bulk properties endpoint. A batch whose bulk request fails, or a
+        batch_size of 1, uses one request per host instead. Batches are fetched
+        by up to `self.workers` threads and processed in the original host order.
+        With a snapshot, only hosts that are new, renamed or older than its
+        maximum age are requested, and every host is recorded in it. on_host is
+        called with the model and CPU of every host as soon as they are known.
+        With a checkpoint, hosts it holds are reused and every fetched host is
+        recorded in it. Both returned maps hold the same HostRecord objects, by hostname and by model.
+        """
+        servers = defaultdict(list)
+        server_models = defaultdict(list)
+        failed = []
+        batch_size = max(1, batch_size)
+        use_bulk = batch_size > 1
+        
+        def collect(batch, records):
+            for host, record in zip(batch, records):
+                resource_id = host.get('identifier')
+                host_name = host.get('resourceKey', {}).get('name', 'Unknown')
                 
-            if not hardware_model:
-                hardware_model = 'Unknown'
+                if verbose:
+                    print(f"[*] Processing host: {host_name}")
                 
-            if not cpu_model:
-                cpu_model = 'Unknown'
+                if record is None:
+                    failed.append(resource_id)
+                    vendor, hardware_model, cpu_model = 'Unknown', 'Unknown', 'Unknown'
+                    if snapshot is not None:
+                        snapshot.keep_host(resource_id)
+                else:
+                    vendor, hardware_model, cpu_model, fetched = record
+                    if snapshot is not None:
+                        snapshot.record_host(resource_id, host_name, vendor, hardware_model, cpu_model, fetched)
+                    if checkpoint is not None:
+                        checkpoint.record_host(self.host, resource_id, host_name, vendor, hardware_model, cpu_model)
                 
+                # Thousands of hosts share a handful of vendor, model and CPU strings
+                record = HostRecord(host_name, sys.intern(vendor), sys.intern(hardware_model), sys.intern(cpu_model), self.host)
+                servers[host_name].append(record)
+                server_models[record.model].append(record)
+                if on_host is not None:
+                    on_host(hardware_model, cpu_model)
+                if verbose:
+                    print(f"[*] Hardware Model: {hardware_model} - CPU {cpu_model}")
+        
+        # Keep a bounded window of batches in flight and collect them in submission order
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in self._iter_batches(hosts, batch_size):
+                pending.append((batch, executor.submit(self._fetch_batch_records, batch, use_bulk, snapshot, checkpoint)))
+                if len(pending) >= self.workers * 2:
+                    batch, future = pending.popleft()
+                    collect(batch, future.result())
             
-            servers[host_name].append({"vendor": vendor,"model": hardware_model, "cpu": cpu_model})
-            server_models[hardware_model].append({"hostname": host_name, "cpu":cpu_model}) 
-            if verbose:
-                print(f"[*] Hardware Model: {hardware_model} - CPU {cpu_model}")
+            while pending:
+                batch, future = pending.popleft()
+                collect(batch, future.result())
+        
+        if failed:
+            print(f"{Fore.YELLOW}[-] Properties could not be retrieved for {len(failed)} hosts of {self.host}: {', '.join(failed)}")
         
         return dict(servers), dict(server_models)
+
+def read_hosts_file(filename: str) -> List[str]:
+    """Read Aria Operations endpoints from a file, one per line. Blank lines and # comments are ignored."""
+    with open(filename, encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+def extract_from_instances(clients: List[AriaOpsClient], page_size: int = DEFAULT_PAGE_SIZE, verbose: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, snapshot: Optional[InventorySnapshot] = None,
+                           on_host: Optional[Callable[[str, str], None]] = None, checkpoint: Optional[RunCheckpoint] = None):
+    """Authenticate and extract the server models of every Aria Operations instance in parallel.
+    
+    The hosts of all instances are merged into one servers and one server_models
+    map, in the order of clients, so a model found in several instances is looked
+    up once. Every host entry keeps the instance it came from in "source".
+    on_host and checkpoint are passed to extract_server_models, on_host may be
+    called from several threads.
+    Returns the merged maps and the instances that could not be read, or only
+    partially when a page of hosts failed. The hosts read are still merged.
+    """
+    def extract(client):
+        if not client.authenticate():
+            print(f"{Fore.RED}[-] Failed to authenticate with Aria Operations {client.host}.")
+            return None
+        print(f"{Fore.GREEN}[+] Authentication successful on {client.host}!")
+        return client.extract_server_models(client.iter_hosts(page_size), verbose, batch_size, snapshot, on_host, checkpoint)
+    
+    servers = defaultdict(list)
+    server_models = defaultdict(list)
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, len(clients))) as executor:
+        for client, result in zip(clients, executor.map(extract, clients)):
+            if result is None:
+                failed.append(client.host)
+                continue
+            instance_servers, instance_models = result
+            for host_name, entries in instance_servers.items():
+                servers[host_name].extend(entries)
+            for model, entries in instance_models.items():
+                server_models[model].extend(entries)
+            print(f"[*] {client.host}: {sum(len(v) for v in instance_models.values())} hosts, {len(instance_models)} server models.")
+            if not client.inventory_complete:
+                print(f"{Fore.YELLOW}[-] {client.host}: the host list could not be read completely, its results are partial.")
+                failed.append(client.host)
+    
+    return dict(servers), dict(server_models), failed
+    
+class TokenBucket:
+    """Thread safe token bucket limiting how many requests per second are sent."""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class GuideWalk:
+    """Resumable compatibility guide walk of one server model.
+    
+    Listings are indexed as the result pages are read. A later call with more
+    CPUs continues from the page where the previous call stopped.
+    """
+    
+    def __init__(self, rows: Callable[[], Iterator[Dict]]):
+        self.index = CpuSeriesIndex()
+        self._new_rows = rows
+        self._rows = None
+        self._exhausted = False
+        self._lock = threading.Lock()
+    
+    def resolve(self, cpus: Iterable[str]) -> Dict[str, Dict]:
+        """Walk the result pages until every CPU series has a listing and return the fields of each CPU."""
+        cpus = set(cpus)
+        wanted = wanted_series_keys(cpus)
+        with self._lock:
+            if wanted and not self._exhausted and not self.index.covers(wanted):
+                if self._rows is None:
+                    self._rows = self._new_rows()
+                try:
+                    for item in self._rows:
+                        self.index.add_listing(item)
+                        if self.index.covers(wanted):
+                            break
+                    else:
+                        self._exhausted = True
+                except Exception:
+                    # Start over on the next call, indexed series keep their first listing
+                    self._rows = None
+                    raise
+            return {cpu: self.index.resolve(cpu) for cpu in cpus}
+
+class MirrorWalk:
+    """Compatibility lookup of one server model answered from the local mirror.
+    
+    Only the listings of the CPU series not looked up yet are read, through the
+    series index of the mirror, so each series gets the same first listing as a
+    full guide walk.
+    """
     
+    def __init__(self, rows: Callable[[List[str]], Iterable[Dict]]):
+        self.index = CpuSeriesIndex()
+        self._series_rows = rows
+        self._searched = set()
+        self._lock = threading.Lock()
+    
+    def resolve(self, cpus: Iterable[str]) -> Dict[str, Dict]:
+        """Look up the CPU series not searched yet and return the fields of each CPU."""
+        cpus = set(cpus)
+        with self._lock:
+            missing = set(wanted_series_keys(cpus)) - self._searched
+            if missing:
+                for item in self._series_rows(sorted(missing)):
+                    self.index.add_listing(item, missing)
+                self._searched |= missing
+            return {cpu: self.index.resolve(cpu) for cpu in cpus}
+
 class VCFCompatibility:
-    def __init__(self):
+    def __init__(self, cache: Optional[CompatibilityCache] = None, workers: int = DEFAULT_GUIDE_WORKERS, rate: float = DEFAULT_GUIDE_RATE, page_size: int = DEFAULT_GUIDE_PAGE_SIZE, guide_url: str = DEFAULT_GUIDE_URL,
+                 mirror: Optional[GuideMirror] = None):
         self.DEFAULTVERSION = "ESXi 9.0"
-        self.base_url = "https://compatibilityguide.broadcom.com/compguide/programs/viewResults?limit=20&page=1&sortBy=partnerName&sortType=ASC"
+        self.base_url = guide_url
+        self.page_size = max(1, page_size)
+        self.cache = cache
+        # Searches are answered from the local mirror instead of the live guide when set
+        self.mirror = mirror
+        # Busy time of the guide searches is recorded when set
+        self.profiler: Optional[Profiler] = None
+        self.reused_models = 0
+        self.workers = max(1, workers)
+        self.rate_limiter = TokenBucket(rate) if rate > 0 else None
+        self.session = create_session(pool_size=max(self.workers, DEFAULT_POOL_SIZE))
+        # One walk per model, shared by the early lookups and check_vcf_compatibility
+        self._walks: Dict[str, Union[GuideWalk, MirrorWalk]] = {}
+        self._started = set()
+        self._walks_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        # At most two early lookups per worker are queued, further hosts do not start one
+        self._early_slots = threading.BoundedSemaphore(self.workers * 2)
+        # Set when an early lookup could not reach the guide, no further ones are started
+        self._early_failed = False
+    
+    def _query_guide(self, payload: dict, page: int = 1) -> dict:
+        """Search the compatibility guide for one result page, answering from the cache when possible."""
+        url = f"{self.base_url}?limit={self.page_size}&page={page}&sortBy=partnerName&sortType=ASC"
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, payload)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        headers = { "Content-Type": "application/json"}
+        with profile_stage(self.profiler, "guide lookups"):
+            response = self.session.post(url,json=payload,headers=headers)
+            response.raise_for_status()
+            jsondump = json.loads(response.text)
+        
+        if self.cache is not None:
+            self.cache.put(cache_key, jsondump)
+        return jsondump
     
     def color_compat(self, compat_list):
         if len(compat_list) > 1:
@@ -211,151 +594,260 @@ class VCFCompatibility:
         print("=" * len(title))
         print(tabulate(table,headers=headers,tablefmt=style))
         
-    def check_vcf_compatibility(self, server_models: dict):
+    def _iter_guide_rows(self, payload: dict) -> Iterator[Dict]:
+        """Yield every listing of a search, requesting the next page only when the caller asks for more rows."""
+        if self.mirror is not None:
+            with profile_stage(self.profiler, "guide lookups"):
+                rows = list(self.mirror.search(payload))
+            yield from rows
+            return
         
-        for key in server_models:
-            if 'vmware' in key.lower() or 'amazon' in key.lower():
-                for value in server_models[key]:
-                    value.update({"compatibility": ["Not Applied"]})
-                    value.update({"vcfSupportedConfirmWvendor": ""})
-                continue
-            
-            # Define the CPU family of each server 
-            temp_cpus = set(server['cpu'] for server in server_models[key])
-            temp_cpus = list(temp_cpus)
-            cpus = []
-            for cpu in temp_cpus:
-                cleaned = re.sub(r'\([^)]*\)', '', cpu)
-                cleaned = re.sub(r'@.*$', '', cleaned)  
-                cleaned = ' '.join(cleaned.split())
-                cpus.append(cleaned)
-            
-            cpu_family = []
-            if len(cpus) <= 1:
-                match = re.search(r'(Gold|Silver|Platinum)\s+(\d{2})', cpu)
-                
-                if match:
-                    series = match.group(1)
-                    family = match.group(2)
-                    cpu_family.append(f"Intel Xeon {series} {family}")
-                else:
-                    cpu_family.append('')
-            else:
-                for cpu in cpus:
-                    match = re.search(r'(Gold|Silver|Platinum)\s+(\d{2})', cpu)
-                    if match:
-                        series = match.group(1)
-                        family = match.group(2)
-                        cpu_family.append(f"Intel Xeon {series} {family}")
-                    else:
-                        continue
+        page = 1
+        seen = 0
+        while True:
+            data = self._query_guide(payload, page)['data']
+            rows = data.get('fieldValues') or []
+            yield from rows
             
-            # Define model and vendor for url search
-            words = key.split()
-            vendor = " ".join(words[:2])
-            model = " ".join(words[2:])
-            
-            if 'dell' in vendor.lower():
-                vendor = 'Dell'
-            
-            if 'hp' in vendor.lower() :
-                vendor = 'Hewlett Packard Enterprise'
-            
-            payload = {
-                "programId":"server",
-                "filters": [
-                    {
-                        "displayKey":"partnerName",
-                        "filterValues":[vendor]
-                    }
-                ],
-                "keyword": [model],
-                "date": {
-                    "startDate":"",
-                    "endDate":""
+            # Count the rows actually served in case the guide caps the page size
+            seen += len(rows)
+            if not rows or seen >= data.get('count', 0):
+                return
+            page += 1
+    
+    def iter_listings(self, partner: Optional[str] = None) -> Iterator[Dict]:
+        """Yield every server listing of the guide, or only those of one partner."""
+        payload = {
+            "programId":"server",
+            "filters": [{"displayKey":"partnerName", "filterValues":[partner]}] if partner else [],
+            "keyword": [],
+            "date": {
+                "startDate":"",
+                "endDate":""
+            }
+        }
+        return self._iter_guide_rows(payload)
+    
+    @staticmethod
+    def _build_payload(key: str) -> dict:
+        """Build the compatibility guide search for a server model."""
+        # Define model and vendor for url search
+        words = key.split()
+        vendor = " ".join(words[:2])
+        model = " ".join(words[2:])
+        
+        if 'dell' in vendor.lower():
+            vendor = 'Dell'
+        
+        if 'hp' in vendor.lower() :
+            vendor = 'Hewlett Packard Enterprise'
+        
+        return {
+            "programId":"server",
+            "filters": [
+                {
+                    "displayKey":"partnerName",
+                    "filterValues":[vendor]
                 }
+            ],
+            "keyword": [model],
+            "date": {
+                "startDate":"",
+                "endDate":""
             }
-            
-            try:
-                headers = { "Content-Type": "application/json"}
-                response = requests.post(self.base_url,json=payload,headers=headers)
-                response.raise_for_status()
-                jsondump = json.loads(response.text)
-                
-                if jsondump['data']['count'] == 0:
-                    for value in server_models[key]:
-                        value.update({"compatibility": ["Not Found"]})
-                        value.update({"vcfSupportedConfirmWvendor": ""})
+        }
+    
+    @staticmethod
+    def _not_applied(key: str) -> bool:
+        return 'vmware' in key.lower() or 'amazon' in key.lower()
+    
+    def _mirror_rows(self, payload: dict, series: List[str]) -> List[Dict]:
+        """Return the mirror listings of a search that support one of the CPU series keys."""
+        with profile_stage(self.profiler, "guide lookups"):
+            return list(self.mirror.search(payload, series))
+    
+    def _model_walk(self, key: str) -> Union[GuideWalk, MirrorWalk]:
+        with self._walks_lock:
+            walk = self._walks.get(key)
+            if walk is None:
+                if self.mirror is not None:
+                    walk = MirrorWalk(lambda series: self._mirror_rows(self._build_payload(key), series))
                 else:
-                    for item in jsondump['data']['fieldValues']:
-                        update_data = {}
-
-                        compatibility = "Not Found"
-                        
-                        for cpu in item['cpuSeries']:
-                            cpu_name = cpu['name'].lower()
-
-                            for cpu_to_search in cpu_family:
-                                search_words = cpu_to_search.lower().split()
-
-                            if all(word in cpu_name for word in search_words):
-                                compatibility = [esxi['name'] for esxi in item['supportedReleases']]
-                                break
-
-                        if compatibility != "Not Found":
-                            break
-
-                    update_data["compatibility"] = compatibility
-
-                    for supportVendor in item['vcfSupportedConfirmWvendor']:
-                        if(supportVendor['name'] == ""):
-                            update_data["vcfSupportedConfirmWvendor"] = ""
-                        else:
-                            esxivendor_list = supportVendor['name'].split('\n')[0].split(',')
-                            esxivendor_list = [v.strip() for v in esxivendor_list]
-                            update_data["vcfSupportedConfirmWvendor"] = esxivendor_list
-
-                    if update_data:
-                        for value in server_models[key]:
-                            value.update(update_data)
-                              
-            except requests.exceptions.RequestException as e:
-                print(f"[-] Error retrieving properties {e}")
-                return {} 
-            except Exception as e:
-                print(f"[-] Runtime error {e}")
-                return {}     
+                    walk = GuideWalk(lambda: self._iter_guide_rows(self._build_payload(key)))
+                self._walks[key] = walk
+            return walk
+    
+    def start_lookup(self, key: str, cpu: str):
+        """Start looking up a CPU series of a model in the background, the first time one of its hosts is seen.
         
-        return server_models
+        Never blocks the caller: nothing is started while the early lookup queue
+        is full or once an early lookup failed to reach the guide.
+        check_vcf_compatibility resolves every model anyway.
+        """
+        if self._early_failed or self._not_applied(key):
+            return
+        series = cpu_series_key(cpu)
+        with self._walks_lock:
+            if series is None or (key, series) in self._started:
+                return
+            if not self._early_slots.acquire(blocking=False):
+                return
+            self._started.add((key, series))
+        
+        walk = self._model_walk(key)
+        future = self._executor.submit(self._early_resolve, walk, cpu)
+        future.add_done_callback(lambda _: self._early_slots.release())
+    
+    def _early_resolve(self, walk: Union[GuideWalk, MirrorWalk], cpu: str):
+        try:
+            walk.resolve([cpu])
+        except requests.exceptions.RequestException:
+            # The final pass reports the error, do not walk other models early against a failing guide
+            self._early_failed = True
+    
+    def _lookup_model(self, key: str, entries: List[HostRecord]) -> Dict[str, Dict]:
+        """Query the compatibility guide for one server model.
+        
+        Returns the fields to set on the hosts of the model, keyed by host CPU model.
+        """
+        cpus = set(server.cpu for server in entries)
+        if self._not_applied(key):
+            not_applied = {"compatibility": ["Not Applied"], "vcfSupportedConfirmWvendor": ""}
+            return {cpu: not_applied for cpu in cpus}
+        
+        # Continue any early walk of the model until every CPU series has a listing
+        return self._model_walk(key).resolve(cpus)
+    
+    def _safe_lookup(self, key: str, entries: List[HostRecord]) -> Dict[str, Dict]:
+        """Run _lookup_model, turning any failure into a Lookup Error result for that model only."""
+        try:
+            return self._lookup_model(key, entries)
+        except requests.exceptions.RequestException as e:
+            print(f"[-] Error retrieving compatibility for {key}: {e}")
+        except Exception as e:
+            print(f"[-] Runtime error for {key}: {e}")
+        lookup_error = {"compatibility": ["Lookup Error"], "vcfSupportedConfirmWvendor": ""}
+        return {server.cpu: lookup_error for server in entries}
     
-    def export_data(self, data, filename="server_export.csv"):
-        script_dir = path.dirname(__file__)
-        if osname == 'nt':
-            filename = script_dir + "\\" + filename
-        elif osname == 'posix':
-            filename = script_dir + "/" + filename
+    def check_vcf_compatibility(self, server_models: dict, snapshot: Optional[InventorySnapshot] = None, snapshot_ttl: float = DEFAULT_CACHE_TTL, on_model: Optional[Callable[[str, List[HostRecord]], None]] = None,
+                                checkpoint: Optional[RunCheckpoint] = None):
+        """Resolve the compatibility of every server model.
         
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
+        Models are looked up by up to `self.workers` threads. Results are applied
+        to the host entries in the order of server_models once they are known,
+        so the outcome does not depend on which lookup finished first. With a
+        snapshot, a model whose CPU set is unchanged reuses its stored result
+        while it is younger than snapshot_ttl hours. on_model is called with each
+        model and its hosts as soon as they are resolved. Walks started by
+        start_lookup during the host extraction are continued, not repeated.
+        With a checkpoint, models resolved before the run was interrupted are
+        reused and every new result is recorded in it.
+        """
+        def lookup(key):
+            if checkpoint is not None:
+                resumed = checkpoint.model_result(key, (server.cpu for server in server_models[key]))
+                if resumed is not None:
+                    return resumed, False
+            if snapshot is not None:
+                stored = snapshot.model_result(key, (server.cpu for server in server_models[key]), snapshot_ttl)
+                if stored is not None:
+                    return stored, True
+            return self._safe_lookup(key, server_models[key]), False
+        
+        models = list(server_models)
+        self.reused_models = 0
+        results = self._executor.map(lookup, models)
+        
+        for key, (updates, reused) in zip(models, results):
+            # Every host of a model and CPU references the same result
+            for record in server_models[key]:
+                record.result = updates[record.cpu]
             
-            # Write header
-            writer.writerow(['Hostname', 'Model', 'CPU', 'Compatibility', 'VCFSupportedConfirmVendor'])
+            if on_model is not None:
+                on_model(key, server_models[key])
             
-            # Write data
-            for server_model, items in data.items():
-                for item in items:
-                    hostname = item['hostname']
-                    cpu = item['cpu']
-                    # Join compatibility list into a single string
-                    compatibility = ', '.join(item['compatibility']) if isinstance(item['compatibility'], list) else item['compatibility']
-                    vendorSupported = ', '.join(item['vcfSupportedConfirmWvendor']) if isinstance(item['vcfSupportedConfirmWvendor'], list) else item['vcfSupportedConfirmWvendor']
-                    writer.writerow([hostname, server_model, cpu, compatibility, vendorSupported])
+            resolved = not any('Lookup Error' in update['compatibility'] for update in updates.values())
+            if reused:
+                self.reused_models += 1
+            elif resolved and snapshot is not None:
+                snapshot.record_model(key, updates)
+            if resolved and checkpoint is not None:
+                checkpoint.record_model(key, updates)
         
-        print("\n")
-        print(f"{Fore.GREEN}[+] Data exported to {filename}{Style.RESET_ALL}")
+        return server_models
+    
+    def close(self):
+        self._executor.shutdown()
+        self.session.close()
+    
+
+def sync_main(argv: List[str]):
+    """Download the compatibility guide server listings into the local mirror."""
+    parser = argparse.ArgumentParser(
+        prog=f"{path.basename(sys.argv[0])} sync",
+        description='Download the Broadcom Compatibility Guide server listings for --offline runs',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --partner Dell --partner "Hewlett Packard Enterprise"
+        """
+    )
+    parser.add_argument(
+        '--partner',
+        action='append',
+        help='Only download the listings of this partner, repeat for several. The listings of other partners already in the mirror are kept'
+    )
+    parser.add_argument(
+        '--mirror',
+        help=f'Mirror file (default: {DEFAULT_MIRROR_FILE} in the script directory)'
+    )
+    parser.add_argument(
+        '--guide-rate',
+        type=float,
+        default=DEFAULT_GUIDE_RATE,
+        help=f'Maximum compatibility guide requests per second, 0 disables the limit (default: {DEFAULT_GUIDE_RATE})'
+    )
+    parser.add_argument(
+        '--guide-page-size',
+        type=int,
+        default=DEFAULT_GUIDE_PAGE_SIZE,
+        help=f'Number of compatibility guide listings per result page (default: {DEFAULT_GUIDE_PAGE_SIZE})'
+    )
+    parser.add_argument(
+        '--guide-url',
+        default=DEFAULT_GUIDE_URL,
+        help=argparse.SUPPRESS
+    )
+    args = parser.parse_args(argv)
+    
+    guide = VCFCompatibility(None, 1, args.guide_rate, args.guide_page_size, args.guide_url)
+    mirror = GuideMirror(args.mirror or path.join(path.dirname(path.abspath(__file__)), DEFAULT_MIRROR_FILE))
     
+    def listings():
+        for partner in args.partner or [None]:
+            print(f"[*] Downloading the server listings of {partner or 'every partner'}...")
+            for count, item in enumerate(guide.iter_listings(partner), start=1):
+                if count % 1000 == 0:
+                    print(f"[*] {count} listings...")
+                yield item
     
+    start = time.monotonic()
+    try:
+        stored = mirror.replace(listings(), args.partner)
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        print(f"{Fore.RED}[-] Sync failed, the mirror was left unchanged: {e}")
+        sys.exit(1)
+    finally:
+        guide.close()
+    
+    print(f"{Fore.GREEN}[+] {stored} listings stored in {mirror.db_path} ({mirror.count} in total) in {time.monotonic() - start:.1f}s")
+    mirror.close()
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'sync':
+        return sync_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description='Check VCF 9 compatibility for servers in Aria Operations',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -364,13 +856,22 @@ Examples:
   %(prog)s --host aria.example.com --username admin --password pass123 --domain LOCAL
   %(prog)s -H aria.example.com -u admin -p pass123 -d domain.com --verbose
   %(prog)s -H aria.example.com -u admin -p pass123 --domain domain.com --no-verify-ssl
+  %(prog)s -H aria1.example.com -H aria2.example.com -u admin -d LOCAL
+  %(prog)s --hosts-file aria_instances.txt -u admin -d LOCAL
+  %(prog)s sync                                     (download the guide for --offline)
+  %(prog)s -H aria.example.com -u admin -d LOCAL --offline
         """
     )
     
     parser.add_argument(
         '-H', '--host',
-        required=False,
-        help='Aria Operations hostname or IP'
+        action='append',
+        default=[],
+        help='Aria Operations hostname or IP, repeat to check several instances in one run'
+    )
+    parser.add_argument(
+        '--hosts-file',
+        help='File with one Aria Operations hostname or IP per line, checked together with any --host'
     )
     parser.add_argument(
         '-u', '--username',
@@ -399,47 +900,221 @@ Examples:
     )
     parser.add_argument(
         '-o', '--output',
-        help='Output results to csv file'
+        help='Output file, used as given (default: server_export.<format> in the script directory)'
+    )
+    parser.add_argument(
+        '-f', '--format',
+        choices=list(EXPORTERS),
+        default='csv',
+        help='Output format (default: csv)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Number of hosts per bulk properties request, 1 requests each host separately (default: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Number of parallel property requests to Aria Operations (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f'Number of hosts per page when enumerating Aria Operations (default: {DEFAULT_PAGE_SIZE})'
+    )
+    parser.add_argument(
+        '--guide-workers',
+        type=int,
+        default=DEFAULT_GUIDE_WORKERS,
+        help=f'Number of parallel compatibility guide lookups (default: {DEFAULT_GUIDE_WORKERS})'
+    )
+    parser.add_argument(
+        '--guide-rate',
+        type=float,
+        default=DEFAULT_GUIDE_RATE,
+        help=f'Maximum compatibility guide requests per second, 0 disables the limit (default: {DEFAULT_GUIDE_RATE})'
+    )
+    parser.add_argument(
+        '--guide-page-size',
+        type=int,
+        default=DEFAULT_GUIDE_PAGE_SIZE,
+        help=f'Number of compatibility guide listings per result page (default: {DEFAULT_GUIDE_PAGE_SIZE})'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Use the local inventory snapshot to fetch only new or changed hosts and re-check only changed models'
+    )
+    parser.add_argument(
+        '--snapshot',
+        help=f'Inventory snapshot file used by --incremental (default: {DEFAULT_SNAPSHOT_FILE} in the script directory)'
+    )
+    parser.add_argument(
+        '--snapshot-max-age',
+        type=float,
+        default=DEFAULT_SNAPSHOT_MAX_AGE,
+        help=f'Hours after which the properties of a known host are fetched again (default: {DEFAULT_SNAPSHOT_MAX_AGE})'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted run, reusing the hosts and models saved in its checkpoint'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        help='Checkpoint file written during the run and read by --resume (default: one file per set of instances in the script directory)'
+    )
+    parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=DEFAULT_CHECKPOINT_INTERVAL,
+        help=f'Seconds between two checkpoint writes (default: {DEFAULT_CHECKPOINT_INTERVAL})'
+    )
+    parser.add_argument(
+        '--guide-url',
+        default=DEFAULT_GUIDE_URL,
+        help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Answer compatibility lookups from the local mirror downloaded by the sync command, without the live guide'
+    )
+    parser.add_argument(
+        '--mirror',
+        help=f'Mirror file used by --offline (default: {DEFAULT_MIRROR_FILE} in the script directory)'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help=f'Hours a cached compatibility guide lookup stays valid (default: {DEFAULT_CACHE_TTL})'
+    )
+    parser.add_argument(
+        '--refresh-cache',
+        action='store_true',
+        help='Ignore cached compatibility guide lookups and store fresh results'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the compatibility guide cache'
+    )
+    parser.add_argument(
+        '--token-cache',
+        action='store_true',
+        help='Reuse a valid Aria Operations token from earlier runs instead of logging in every time'
+    )
+    parser.add_argument(
+        '--token-cache-file',
+        help=f'Token cache file used by --token-cache (default: {default_cache_file()})'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        help='Write per-phase timings, request counts, bytes, latency percentiles, retries and cache hits to this JSON file'
     )
     
     args = parser.parse_args()
     
+    aria_hosts = list(args.host)
+    if args.hosts_file:
+        aria_hosts.extend(read_hosts_file(args.hosts_file))
+    # The same instance listed twice would count its hosts twice
+    aria_hosts = list(dict.fromkeys(aria_hosts))
+    if not aria_hosts:
+        parser.error("at least one --host or a --hosts-file is required")
+    
     # Suppress SSL warnings if verification is disabled
     if args.no_verify_ssl:
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     
+    mirror = None
+    if args.offline:
+        mirror = GuideMirror(args.mirror or path.join(path.dirname(path.abspath(__file__)), DEFAULT_MIRROR_FILE))
+        if mirror.synced_at is None:
+            print(f"{Fore.RED}[-] The compatibility guide mirror {mirror.db_path} is empty, run the sync command first.")
+            sys.exit(1)
+        print(f"[*] Using the compatibility guide mirror synced {time.strftime('%Y-%m-%d %H:%M', time.localtime(mirror.synced_at))} ({mirror.count} listings).")
+    
     if not args.password:
         args.password = getpass.getpass("Enter password: ")
     
-    print("[*] Connecting to Aria Operations...")
-    aria_client = AriaOpsClient(
-        args.host,
-        args.username,
-        args.domain,
-        args.password,
-        verify_ssl=not args.no_verify_ssl
-    )
+    profiler = Profiler()
+    profiler.start_phase("aria inventory")
+    print(f"[*] Connecting to {len(aria_hosts)} Aria Operations instance(s)...")
+    token_cache = TokenCache(args.token_cache_file) if args.token_cache else None
+    aria_clients = [
+        AriaOpsClient(
+            host,
+            args.username,
+            args.domain,
+            args.password,
+            verify_ssl=not args.no_verify_ssl,
+            workers=args.workers,
+            token_cache=token_cache
+        )
+        for host in aria_hosts
+    ]
     
-    # Try to authenticate
-    if not aria_client.authenticate():
-        print(f"{Fore.RED}[-] Failed to authenticate with Aria Operations.")
-        sys.exit(1)
-    print(f"{Fore.GREEN}[+] Authentication successful!")
-    print("[*] Retrieving server information from Aria Operations...")
+    snapshot = None
+    if args.incremental:
+        snapshot = InventorySnapshot(args.snapshot or path.join(path.dirname(path.abspath(__file__)), DEFAULT_SNAPSHOT_FILE), args.snapshot_max_age)
     
-    # Search for hosts
-    hosts = aria_client.get_all_hosts()
-    print(f"[*] Found {len(hosts)} hosts.")
+    # New instance VCFCompatibility class
+    cache = None
+    if not args.no_cache and mirror is None:
+        cache = CompatibilityCache(path.join(path.dirname(path.abspath(__file__)), DEFAULT_CACHE_FILE), args.cache_ttl, args.refresh_cache)
+    compatibility_client = VCFCompatibility(cache, args.guide_workers, args.guide_rate, args.guide_page_size, args.guide_url, mirror)
+    if args.profile:
+        for session in [client.session for client in aria_clients] + [compatibility_client.session]:
+            profiler.attach(session)
+        for client in aria_clients:
+            client.profiler = profiler
+        compatibility_client.profiler = profiler
+    
+    # Saved at the interval and when the script exits before the run completes
+    checkpoint = RunCheckpoint(args.checkpoint or path.join(path.dirname(path.abspath(__file__)), default_checkpoint_file(aria_hosts)),
+                               aria_hosts, args.checkpoint_interval, args.resume)
+    if checkpoint.in_use:
+        print(f"{Fore.YELLOW}[-] The checkpoint {checkpoint.filename} is used by another run, this run is not checkpointed.")
+    elif checkpoint.mismatch:
+        print(f"{Fore.YELLOW}[-] The checkpoint {checkpoint.filename} belongs to other Aria Operations instances, starting over.")
+    elif args.resume:
+        print(f"[*] Resuming from {checkpoint.filename}: {checkpoint.available_hosts} hosts and {checkpoint.available_models} server models already done.")
+    atexit.register(checkpoint.close)
     
-    # Extract server models
-    print("[*] Extracting server models...")
-    servers, server_models = aria_client.extract_server_models(hosts, args.verbose)
+    def on_host(key, cpu):
+        # Models the snapshot or the checkpoint already resolved are most likely reused, do not query them early
+        if (snapshot is None or not snapshot.has_model(key)) and not checkpoint.has_model(key):
+            compatibility_client.start_lookup(key, cpu)
+    
+    # Search for hosts and extract server models of every instance as the pages arrive,
+    # looking up each model in the compatibility guide as soon as its first host is seen
+    print("[*] Retrieving server information from Aria Operations...")
+    servers, server_models, failed_instances = extract_from_instances(aria_clients, args.page_size, args.verbose, args.batch_size, snapshot, on_host, checkpoint)
+    if len(failed_instances) == len(aria_clients) and not server_models:
+        print(f"{Fore.RED}[-] Failed to read the inventory of Aria Operations.")
+        sys.exit(1)
     server_models = dict(sorted(server_models.items()))
+    print(f"[*] Found {sum(len(v) for v in server_models.values())} hosts.")
     print(f"[*] Found {len(server_models)} unique server models.")
     
-    # New instance VCFCompatibility class
-    compatibility_client = VCFCompatibility()
+    if snapshot is not None:
+        if failed_instances:
+            # Hosts of an unreadable instance are not removed from the snapshot
+            snapshot.keep_unseen()
+        removed = snapshot.removed
+        print(f"[*] Inventory delta: {len(snapshot.added)} added, {len(removed)} removed, {len(snapshot.changed)} changed hosts.")
+        if args.verbose:
+            for label, hostnames in (("Added", snapshot.added), ("Removed", removed), ("Changed", snapshot.changed)):
+                for hostname in hostnames:
+                    print(f"    {label}: {hostname}")
     
     if args.verbose:
         # Output the Model list
@@ -456,119 +1131,109 @@ Examples:
         headers = ["#", "Server Model", "Quantity"]
         compatibility_client.print_table("[*] TOTAL", table, headers)
     
-    # Return compatibility of each host
-    compatibility_client.check_vcf_compatibility(server_models)
+    # Return compatibility of each host, exporting every model as soon as it is resolved
+    if args.output:
+        filename = args.output
+    else:
+        filename = path.join(path.dirname(path.abspath(__file__)), f"server_export.{EXPORTERS[args.format].extension}")
+    # The source instance is only exported when the run covers more than one
+    try:
+        exporter = create_exporter(args.format, filename, with_source=len(aria_clients) > 1)
+    except ValueError as e:
+        print(f"{Fore.RED}[-] {e}")
+        sys.exit(1)
     
+    snapshot_ttl = 0 if args.refresh_cache else args.cache_ttl
+    profiler.start_phase("compatibility + export")
+    try:
+        compatibility_client.check_vcf_compatibility(server_models, snapshot, snapshot_ttl,
+                                                     lambda key, items: exporter.write_rows(model_rows(key, items)), checkpoint)
+    finally:
+        exporter.close()
+        compatibility_client.close()
+    if snapshot is not None:
+        print(f"[*] {compatibility_client.reused_models} of {len(server_models)} server models unchanged since the last snapshot.")
+        snapshot.save()
+        snapshot.close()
+    if args.resume:
+        print(f"[*] Reused from the checkpoint: {checkpoint.resumed_hosts} hosts, {checkpoint.resumed_models} server models.")
+    if failed_instances and not checkpoint.in_use:
+        # The run is partial, keep what was fetched for a later --resume
+        checkpoint.save()
+        print(f"{Fore.YELLOW}[-] The run is partial, checkpoint kept in {checkpoint.filename} for --resume.")
+    else:
+        # Every host and model is exported, the checkpoint is not needed anymore
+        checkpoint.complete()
+    
+    # Aggregate every host once for the tables and the export
+    profiler.start_phase("aggregate")
+    report = aggregate_results(server_models)
+    
+    profiler.start_phase("render")
     # Prepare table for output
     table = []
-    idx = 1
     headers = ["#", "Server Model", "CPU", "Quantity", "Compatibility", "VCFSupportedConfirmWithVendor"]
-    for key in server_models:
-        for item in server_models[key]:
-            cpu_data = defaultdict(lambda: {"count": 0, "compatibility": set(), "vcfSupportedConfirmWvendor": ""})
-            
-            for item in server_models[key]:
-                cpu = item["cpu"]
-                cpu_data[cpu]["count"] += 1
-                cpu_data[cpu]["vcfSupportedConfirmWvendor"] = item["vcfSupportedConfirmWvendor"]
-                
-                if isinstance(item['compatibility'], list):
-                    cpu_data[cpu]["compatibility"].update(item['compatibility'])
-                else:
-                    cpu_data[cpu]["compatibility"].add(item['compatibility'])
-                
-        for cpu, data in cpu_data.items():
-            # Convert set to sorted list
-            compat_list = sorted(data["compatibility"])
-            vendorConfirmed = sorted(data["vcfSupportedConfirmWvendor"])
-            
-            table.append([
-                idx,
-                key,
-                cpu,
-                data["count"],
-                compatibility_client.color_compat(compat_list),
-                compatibility_client.color_compat(vendorConfirmed)
-            ])
-            idx += 1 
+    for idx, ((key, cpu), data) in enumerate(report.summary.items(), start=1):
+        table.append([
+            idx,
+            key,
+            cpu,
+            data.count,
+            compatibility_client.color_compat(sorted(data.compatibility)),
+            compatibility_client.color_compat(sorted(data.vendor_confirmed))
+        ])
             
     # Output the summary
     compatibility_client.print_table("[*] SUMMARY", table, headers,"fancy_grid")
     
-    # Prepare detailed output
-    vcf9 = {}
-    notcompatible = {}
-    notapplied = {}
-    notfound = {}
-    for key in server_models:
-        vcf9[key] = []
-        notcompatible[key] = []
-        notapplied[key] = []
-        notfound[key] = []
-        
-        for item in server_models[key]:
-            if 'Not Applied' in item.get('compatibility'):
-                notapplied[key].append(item)
-            elif 'Not Found' in item.get('compatibility'):
-                notfound[key].append(item)
-            elif 'ESXi 9.0' in item.get('compatibility', []):
-                vcf9[key].append(item)
-            else:
-                notcompatible[key].append(item)
-
-        # Remove empty lists
-        if not notapplied[key]:
-            del notapplied[key]
-        if not notfound[key]:
-            del notfound[key]
-        if not notcompatible[key]:
-            del notcompatible[key]
-        if not vcf9[key]:
-            del vcf9[key]
-    
     if args.verbose:
         # Output detailed results
-        table = []
         headers = ["#", "Model", "Quantity"]
-        table = []
-        for key in notapplied:
-            table.append([i, key, len(notapplied[key])])
-            i += 1
-        compatibility_client.print_table("NOT APPLIED", table, headers)
-        
-        table.clear()
-        for key in notfound:
-            table.append([i, key, len(notfound[key])])
-            i += 1
-        compatibility_client.print_table("NOT FOUND", table, headers)
-        
-        table.clear()
-        for key in notcompatible:
-            table.append([i, key, len(notcompatible[key])])
-            i += 1
-        compatibility_client.print_table("NOT COMPATIBLE", table, headers)
-        
-        table.clear()
-        for key in vcf9:
-            table.append([i, key, len(vcf9[key])])
-            i += 1
-        compatibility_client.print_table("VCF 9 COMPATIBLE SERVERS", table, headers)
+        for category, title in ((NOT_APPLIED, "NOT APPLIED"), (NOT_FOUND, "NOT FOUND"), (LOOKUP_ERROR, "LOOKUP ERROR"),
+                                (NOT_COMPATIBLE, "NOT COMPATIBLE"), (VCF9, "VCF 9 COMPATIBLE SERVERS")):
+            table = []
+            for key, count in report.categories[category].items():
+                table.append([i, key, count])
+                i += 1
+            compatibility_client.print_table(title, table, headers)
     
     # Summary Totals
-    total_vcf9 = sum(len(v) for v in vcf9.values())
-    total_notapplied = sum(len(v) for v in notapplied.values())
-    total_notcompatible = sum(len(v) for v in notcompatible.values())
-    total_notfound = sum(len(v) for v in notfound.values())
-    
-    headers = ["VCF 9.0", "NOT COMPATIBLE", "NOT FOUND", "NOT APPLIED"]
-    table = [[total_vcf9, total_notcompatible, total_notfound, total_notapplied]]
+    headers = [VCF9, NOT_COMPATIBLE, NOT_FOUND, NOT_APPLIED]
+    if report.totals[LOOKUP_ERROR]:
+        headers.append(LOOKUP_ERROR)
+    table = [[report.totals[category] for category in headers]]
     compatibility_client.print_table("[*] TOTAL SUMMARY", table, headers,"fancy_grid")
     
-    # Export data
-    if args.output:
-        compatibility_client.export_data(server_models, args.output)
-    else:
-        compatibility_client.export_data(server_models)
+    print("\n")
+    print(f"{Fore.GREEN}[+] Data exported to {filename}{Style.RESET_ALL}")
+    if failed_instances:
+        print(f"{Fore.YELLOW}[-] Partial results, not read or not read completely: {', '.join(failed_instances)}")
+    
+    if cache is not None:
+        print(f"[*] Compatibility guide cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+    if mirror is not None:
+        mirror.close()
+    
+    if args.profile:
+        profiler.count("hosts", sum(len(v) for v in server_models.values()))
+        profiler.count("models", len(server_models))
+        if cache is not None:
+            profiler.count("guide_cache_hits", cache.hits)
+            profiler.count("guide_cache_misses", cache.misses)
+        if snapshot is not None:
+            profiler.count("snapshot_models_reused", compatibility_client.reused_models)
+        profile = profiler.write(args.profile)
+        
+        table = [[p["phase"], p["seconds"], p["requests"], p["body_bytes"], p["retries"]] for p in profile["phases"]]
+        compatibility_client.print_table("[*] PROFILE", table, ["Phase", "Seconds", "Requests", "Body bytes", "Retries"])
+        table = [[name, e["requests"], e["errors"], e["retries"], e["latency_ms"]["p50"], e["latency_ms"]["p95"], e["latency_ms"]["p99"]]
+                 for name, e in profile["endpoints"].items()]
+        compatibility_client.print_table("[*] ENDPOINTS", table, ["Endpoint", "Requests", "Errors", "Retries", "p50 ms", "p95 ms", "p99 ms"])
+        # Busy seconds are summed over the threads, they can exceed the wall time of the phase
+        table = [[name, s["calls"], s["errors"], s["seconds"]] for name, s in profile["stages"].items()]
+        compatibility_client.print_table("[*] STAGES", table, ["Stage", "Calls", "Errors", "Busy seconds"])
+        print(f"[+] Profile written to {args.profile}")
     
 if __name__ == '__main__':
     __VERSION__ = "1.1"
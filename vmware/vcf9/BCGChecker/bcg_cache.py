@@ -0,0 +1,79 @@
+"""
+Persistent cache of Broadcom Compatibility Guide lookups for BCGChecker
+
+Responses are stored in a SQLite database keyed by the normalized search
+payload, so repeated runs against the same server models skip the guide.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from typing import Optional
+import json
+import sqlite3
+import threading
+import time
+
+# Default time to live of a cached lookup, in hours
+DEFAULT_CACHE_TTL = 24
+DEFAULT_CACHE_FILE = "bcg_cache.db"
+
+
+class CompatibilityCache:
+    """SQLite backed cache of compatibility guide responses with a TTL."""
+
+    def __init__(self, db_path: str, ttl_hours: float = DEFAULT_CACHE_TTL, refresh: bool = False):
+        self.db_path = db_path
+        self.ttl = ttl_hours * 3600
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "key TEXT PRIMARY KEY, "
+            "response TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url: str, payload: dict) -> str:
+        """Build a cache key from the request url and a normalized copy of the payload."""
+        def normalize(value):
+            if isinstance(value, dict):
+                return {k: normalize(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [normalize(v) for v in value]
+            if isinstance(value, str):
+                return ' '.join(value.lower().split())
+            return value
+
+        return json.dumps({"url": url, "payload": normalize(payload)}, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached response for key, or None when missing, expired or refreshing."""
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute("SELECT response, fetched_at FROM lookups WHERE key = ?", (key,)).fetchone()
+
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, response: dict):
+        """Store a response for key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups (key, response, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(response), time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,240 @@
+"""
+Resumable checkpoints for long BCGChecker runs
+
+The properties of every host fetched and the compatibility result of every
+model resolved are written to a JSON state file at a fixed interval and when
+the script exits early. --resume reuses them, so an interrupted run only
+fetches and looks up what it had not finished. The file is replaced
+atomically and removed once a run completes. The default file is named after
+the Aria Operations instances of the run, and a lock file, removed when the
+run ends, keeps two runs from using the same checkpoint at once.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from os import path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+if os.name == 'nt':
+    import msvcrt
+    fcntl = None
+else:
+    import fcntl
+    msvcrt = None
+
+DEFAULT_CHECKPOINT_FILE = "bcg_checkpoint_{instances}.json"
+# Seconds between two checkpoint writes
+DEFAULT_CHECKPOINT_INTERVAL = 30
+CHECKPOINT_VERSION = 1
+
+
+def default_checkpoint_file(instances: List[str]) -> str:
+    """Return the checkpoint file name of a set of Aria Operations instances."""
+    digest = hashlib.sha1("\0".join(sorted(instances)).encode()).hexdigest()
+    return DEFAULT_CHECKPOINT_FILE.format(instances=digest[:12])
+
+
+class RunCheckpoint:
+    """Host properties and model results of the current run, saved periodically.
+
+    When resuming, the saved state is kept and completed by this run, so a run
+    interrupted again still holds everything done before. When another run
+    holds the checkpoint, in_use is set and nothing is read or written.
+    """
+
+    def __init__(self, filename: str, instances: List[str], interval: float = DEFAULT_CHECKPOINT_INTERVAL, resume: bool = False):
+        self.filename = filename
+        self.instances = sorted(instances)
+        self.interval = interval
+        self.resumed_hosts = 0
+        self.resumed_models = 0
+        self.mismatch = False
+        self.in_use = False
+        self._hosts: Dict[str, Dict[str, list]] = {}
+        self._models: Dict[str, Dict[str, Dict]] = {}
+        self._previous_hosts: Dict[str, Dict[str, list]] = {}
+        self._previous_models: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._saved = time.monotonic()
+        # Set when the state changed since it was loaded or last saved
+        self._dirty = False
+        self._done = False
+        self._lock_fd = self._acquire_file_lock()
+        if self._lock_fd is None:
+            self.in_use = True
+            self._done = True
+        elif resume:
+            self._load()
+
+    def _acquire_file_lock(self) -> Optional[int]:
+        """Lock the checkpoint for this run, return None when another run holds it."""
+        lock_file = self.filename + ".lock"
+        while True:
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if msvcrt is not None:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return None
+            # The run that held the lock may have removed the file meanwhile, lock the new one then
+            try:
+                if path.samestat(os.fstat(fd), os.stat(lock_file)):
+                    return fd
+            except FileNotFoundError:
+                pass
+            self._unlock(fd)
+
+    @staticmethod
+    def _unlock(fd: int):
+        if msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _release_file_lock(self):
+        """Remove the lock file and release the lock."""
+        if self._lock_fd is None:
+            return
+        lock_file = self.filename + ".lock"
+        if msvcrt is None:
+            # Removed while still locked, a run that opened it meanwhile sees the file is gone
+            try:
+                os.remove(lock_file)
+            except FileNotFoundError:
+                pass
+            self._unlock(self._lock_fd)
+        else:
+            # An open file cannot be removed on Windows, one locked by another run by now is kept
+            self._unlock(self._lock_fd)
+            try:
+                os.remove(lock_file)
+            except OSError:
+                pass
+        self._lock_fd = None
+
+    def _load(self):
+        try:
+            with open(self.filename, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[-] Checkpoint {self.filename} could not be read, starting over: {e}")
+            return
+
+        # A checkpoint of other instances or of another format is not reused
+        if state.get("version") != CHECKPOINT_VERSION or sorted(state.get("instances", [])) != self.instances:
+            self.mismatch = True
+            return
+        self._previous_hosts = state.get("hosts", {})
+        self._previous_models = state.get("models", {})
+        # Saved again as they are until this run proves an entry stale or replaces it
+        self._hosts = {source: dict(hosts) for source, hosts in self._previous_hosts.items()}
+        self._models = dict(self._previous_models)
+
+    @property
+    def available_hosts(self) -> int:
+        return sum(len(hosts) for hosts in self._previous_hosts.values())
+
+    @property
+    def available_models(self) -> int:
+        return len(self._previous_models)
+
+    def reusable(self, source: str, identifier: str, hostname: str) -> Optional[Tuple[str, str, str]]:
+        """Return the (vendor, model, cpu) of a host fetched before the run was interrupted."""
+        record = self._previous_hosts.get(source, {}).get(identifier)
+        if record is None:
+            return None
+        if record[0] != hostname:
+            # The identifier belongs to another host now, its saved properties are stale
+            with self._lock:
+                if self._hosts.get(source, {}).get(identifier) == record:
+                    del self._hosts[source][identifier]
+                    self._dirty = True
+            return None
+        with self._lock:
+            self.resumed_hosts += 1
+        return record[1], record[2], record[3]
+
+    def record_host(self, source: str, identifier: str, hostname: str, vendor: str, model: str, cpu: str):
+        with self._lock:
+            self._hosts.setdefault(source, {})[identifier] = [hostname, vendor, model, cpu]
+            self._dirty = True
+        self.save(force=False)
+
+    def has_model(self, model: str) -> bool:
+        return model in self._previous_models
+
+    def model_result(self, model: str, cpus: Iterable[str]) -> Optional[Dict[str, Dict]]:
+        """Return the stored result of a model when it covers every CPU the model has now."""
+        stored = self._previous_models.get(model)
+        if stored is None:
+            return None
+        cpus = set(cpus)
+        if not cpus <= stored.keys():
+            return None
+        with self._lock:
+            self.resumed_models += 1
+        return {cpu: stored[cpu] for cpu in cpus}
+
+    def record_model(self, model: str, result: Dict[str, Dict]):
+        with self._lock:
+            self._models[model] = result
+            self._dirty = True
+        self.save(force=False)
+
+    def save(self, force: bool = True):
+        """Write the checkpoint atomically, or only when the interval elapsed unless force is set.
+
+        Nothing is written when the state did not change, so a run that fails
+        before fetching anything leaves the checkpoint it resumed untouched.
+        """
+        with self._lock:
+            if self._done or not self._dirty or (not force and time.monotonic() - self._saved < self.interval):
+                return
+            state = {
+                "version": CHECKPOINT_VERSION,
+                "instances": self.instances,
+                "saved_at": time.time(),
+                "hosts": self._hosts,
+                "models": self._models
+            }
+            temp_file = f"{self.filename}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            # Readers see either the previous or the new checkpoint, never a partial one
+            os.replace(temp_file, self.filename)
+            self._saved = time.monotonic()
+            self._dirty = False
+
+    def complete(self):
+        """Remove the checkpoint once the run finished, later saves are ignored.
+
+        A checkpoint held by another run is left alone.
+        """
+        with self._lock:
+            if self.in_use:
+                return
+            self._done = True
+            if path.exists(self.filename):
+                os.remove(self.filename)
+            self._release_file_lock()
+
+    def close(self):
+        """Save the checkpoint when it changed and release it for other runs."""
+        self.save()
+        with self._lock:
+            self._done = True
+            self._release_file_lock()
@@ -0,0 +1,129 @@
+"""
+Streaming exporters for BCGChecker results
+
+Rows are written as each server model is resolved, see bcg_report.model_rows
+for the row layout. With with_source, every format also records the Aria
+Operations instance of each host, for runs that cover several instances.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from typing import Iterable
+import csv
+import json
+import sqlite3
+
+CSV_HEADER = ['Hostname', 'Model', 'CPU', 'Compatibility', 'VCFSupportedConfirmVendor']
+
+
+class CsvExporter:
+    """Write one CSV line per host."""
+    extension = "csv"
+
+    def __init__(self, filename: str, with_source: bool = False):
+        self.filename = filename
+        self.with_source = with_source
+        self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADER + ['Source'] if with_source else CSV_HEADER)
+
+    def write_rows(self, rows: Iterable[tuple]):
+        for hostname, model, cpu, compatibility, vendor_confirmed, _, source in rows:
+            row = [hostname, model, cpu, ', '.join(compatibility), ', '.join(vendor_confirmed)]
+            if self.with_source:
+                row.append(source)
+            self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlExporter:
+    """Write one JSON object per host and line."""
+    extension = "jsonl"
+
+    def __init__(self, filename: str, with_source: bool = False):
+        self.filename = filename
+        self.with_source = with_source
+        self._file = open(filename, 'w', encoding='utf-8')
+
+    def write_rows(self, rows: Iterable[tuple]):
+        for hostname, model, cpu, compatibility, vendor_confirmed, status, source in rows:
+            record = {
+                "hostname": hostname,
+                "model": model,
+                "cpu": cpu,
+                "compatibility": compatibility,
+                "vcfSupportedConfirmWvendor": vendor_confirmed,
+                "status": status
+            }
+            if self.with_source:
+                record["source"] = source
+            self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteExporter:
+    """Write the hosts into an indexed SQLite table, replacing any previous export in the file.
+
+    A file holding other tables, such as the snapshot or the guide mirror, is
+    refused with a ValueError instead of being written into.
+    """
+    extension = "db"
+    table = "bcg_export_hosts"
+
+    def __init__(self, filename: str, with_source: bool = False):
+        self.filename = filename
+        self.with_source = with_source
+        self._conn = sqlite3.connect(filename)
+        other_tables = [name for (name,) in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+                        if name != self.table]
+        if other_tables:
+            self._conn.close()
+            raise ValueError(f"{filename} is not a BCGChecker export, it holds the tables {', '.join(other_tables)}")
+        with self._conn:
+            self._conn.executescript(
+                f"DROP TABLE IF EXISTS {self.table};"
+                f"CREATE TABLE {self.table} ("
+                "hostname TEXT NOT NULL, "
+                "model TEXT NOT NULL, "
+                "cpu TEXT NOT NULL, "
+                "compatibility TEXT NOT NULL, "
+                "vcf_supported_confirm_vendor TEXT NOT NULL, "
+                "status TEXT NOT NULL"
+                + (", source TEXT NOT NULL);" if with_source else ");") +
+                f"CREATE INDEX idx_{self.table}_model ON {self.table} (model);"
+                f"CREATE INDEX idx_{self.table}_cpu ON {self.table} (cpu);"
+                f"CREATE INDEX idx_{self.table}_status ON {self.table} (status);"
+            )
+
+    def write_rows(self, rows: Iterable[tuple]):
+        if self.with_source:
+            query = f"INSERT INTO {self.table} (hostname, model, cpu, compatibility, vcf_supported_confirm_vendor, status, source) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        else:
+            query = f"INSERT INTO {self.table} (hostname, model, cpu, compatibility, vcf_supported_confirm_vendor, status) VALUES (?, ?, ?, ?, ?, ?)"
+        records = ((hostname, model, cpu, ', '.join(compatibility), ', '.join(vendor_confirmed), status, source)
+                   for hostname, model, cpu, compatibility, vendor_confirmed, status, source in rows)
+        if not self.with_source:
+            records = (record[:-1] for record in records)
+        with self._conn:
+            self._conn.executemany(query, records)
+
+    def close(self):
+        self._conn.close()
+
+
+EXPORTERS = {
+    "csv": CsvExporter,
+    "jsonl": JsonlExporter,
+    "sqlite": SqliteExporter
+}
+
+
+def create_exporter(export_format: str, filename: str, with_source: bool = False):
+    """Open the exporter registered for export_format."""
+    return EXPORTERS[export_format](filename, with_source)
@@ -0,0 +1,133 @@
+"""
+CPU series matching between Aria Operations hosts and Broadcom Compatibility Guide listings
+
+Host CPU strings and guide CPU series names are reduced to the same series key,
+for example:
+    Intel(R) Xeon(R) Gold 6138 CPU @ 2.00GHz    -> intel xeon gold 61
+    Intel Xeon Gold 6100 Series                  -> intel xeon gold 61
+    Intel(R) Xeon(R) CPU E5-2680 v4 @ 2.40GHz    -> intel xeon e5 26 v4
+    AMD EPYC 7543 32-Core Processor              -> amd epyc 7003
+so each host resolves with a single dictionary lookup.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+import re
+import sys
+
+_PARENTHESES = re.compile(r'\([^)]*\)')
+_FREQUENCY = re.compile(r'@.*$')
+
+# Host CPU models
+_HOST_SCALABLE = re.compile(r'\b(bronze|silver|gold|platinum)\s+(\d{2})\d{2}', re.IGNORECASE)
+_HOST_E_SERIES = re.compile(r'\b(e[357])-(\d{2})\d{2}[a-z]*(?:\s*(v\d))?', re.IGNORECASE)
+_HOST_EPYC = re.compile(r'\bepyc\s+(\d)[0-9a-z]{2}(\d)', re.IGNORECASE)
+
+# Compatibility guide CPU series names, which may list several families ("Gold 5400/6400 Series")
+_GUIDE_SCALABLE = re.compile(r'\b(bronze|silver|gold|platinum)\s+(\d{4}(?:\s*/\s*\d{4})*)', re.IGNORECASE)
+_GUIDE_E_SERIES = re.compile(r'\b(e[357])-(\d{2})00(?:[\s-]*(v\d))?', re.IGNORECASE)
+_GUIDE_EPYC = re.compile(r'\bepyc\s+(\d)00(\d)', re.IGNORECASE)
+_FAMILY_SEPARATOR = re.compile(r'\s*/\s*')
+
+NOT_FOUND = {"compatibility": ["Not Found"], "vcfSupportedConfirmWvendor": ""}
+
+
+@lru_cache(maxsize=None)
+def normalize_cpu(cpu: str) -> str:
+    """Strip trademarks, frequency and extra spaces from a CPU model string."""
+    cleaned = _PARENTHESES.sub('', cpu)
+    cleaned = _FREQUENCY.sub('', cleaned)
+    return ' '.join(cleaned.split())
+
+
+@lru_cache(maxsize=None)
+def cpu_series_key(cpu: str) -> Optional[str]:
+    """Return the series key of a host CPU model, or None when the family is not recognized."""
+    cleaned = normalize_cpu(cpu)
+
+    match = _HOST_SCALABLE.search(cleaned)
+    if match:
+        return f"intel xeon {match.group(1).lower()} {match.group(2)}"
+
+    match = _HOST_E_SERIES.search(cleaned)
+    if match:
+        key = f"intel xeon {match.group(1).lower()} {match.group(2)}"
+        return f"{key} {match.group(3).lower()}" if match.group(3) else key
+
+    match = _HOST_EPYC.search(cleaned)
+    if match:
+        return f"amd epyc {match.group(1)}00{match.group(2)}"
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def guide_series_keys(series_name: str) -> tuple:
+    """Return the series keys covered by a compatibility guide CPU series name."""
+    keys = []
+
+    for match in _GUIDE_SCALABLE.finditer(series_name):
+        tier = match.group(1).lower()
+        for family in _FAMILY_SEPARATOR.split(match.group(2)):
+            keys.append(f"intel xeon {tier} {family[:2]}")
+
+    for match in _GUIDE_E_SERIES.finditer(series_name):
+        key = f"intel xeon {match.group(1).lower()} {match.group(2)}"
+        keys.append(f"{key} {match.group(3).lower()}" if match.group(3) else key)
+
+    for match in _GUIDE_EPYC.finditer(series_name):
+        keys.append(f"amd epyc {match.group(1)}00{match.group(2)}")
+
+    return tuple(keys)
+
+
+def listing_result(item: Dict) -> Dict:
+    """Build the compatibility fields of a host from a compatibility guide listing."""
+    result = {
+        "compatibility": [sys.intern(esxi['name']) for esxi in item.get('supportedReleases', [])],
+        "vcfSupportedConfirmWvendor": ""
+    }
+
+    for supportVendor in item.get('vcfSupportedConfirmWvendor', []):
+        if supportVendor['name'] == "":
+            result["vcfSupportedConfirmWvendor"] = ""
+        else:
+            esxivendor_list = supportVendor['name'].split('\n')[0].split(',')
+            result["vcfSupportedConfirmWvendor"] = [v.strip() for v in esxivendor_list]
+
+    return result
+
+
+class CpuSeriesIndex:
+    """Hash index from CPU series key to the result of the first guide listing supporting it."""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict] = {}
+
+    def add_listing(self, item: Dict, keys: Optional[Iterable[str]] = None):
+        """Index every CPU series of a listing that is not indexed yet, or only those among keys."""
+        result = None
+        for cpu in item.get('cpuSeries', []):
+            for key in guide_series_keys(cpu.get('name', '')):
+                if key not in self.entries and (keys is None or key in keys):
+                    if result is None:
+                        result = listing_result(item)
+                    self.entries[key] = result
+
+    def covers(self, keys: Iterable[str]) -> bool:
+        """Return True when every key already has a listing."""
+        return all(key in self.entries for key in keys)
+
+    def resolve(self, cpu: str) -> Dict:
+        """Return the compatibility fields for a host CPU model."""
+        key = cpu_series_key(cpu)
+        if key is None:
+            return NOT_FOUND
+        return self.entries.get(key, NOT_FOUND)
+
+
+def wanted_series_keys(cpus: Iterable[str]) -> List[str]:
+    """Return the distinct, recognized series keys of a set of host CPU models."""
+    return sorted({key for key in map(cpu_series_key, cpus) if key})
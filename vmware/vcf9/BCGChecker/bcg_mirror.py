@@ -0,0 +1,143 @@
+"""
+Local mirror of the Broadcom Compatibility Guide server listings
+
+`BCGChecker.py sync` downloads the server program listings into a SQLite store
+indexed by partner and CPU series, with the lowercased model name kept for the
+keyword search. With --offline, the compatibility lookups are answered from the
+store instead of the live guide, in the same order the guide returns them, and
+only the listings of the CPU series a model needs are read.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+import json
+import sqlite3
+import threading
+import time
+
+from bcg_matcher import guide_series_keys
+
+DEFAULT_MIRROR_FILE = "bcg_guide.db"
+
+
+class GuideMirror:
+    """SQLite store of compatibility guide server listings."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "id INTEGER PRIMARY KEY, "
+            "position INTEGER NOT NULL, "
+            "partner TEXT NOT NULL, "
+            "partner_key TEXT NOT NULL, "
+            "model TEXT NOT NULL, "
+            "model_key TEXT NOT NULL DEFAULT '', "
+            "data TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS listing_series (series TEXT NOT NULL, listing_id INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS sync_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_listings_partner ON listings (partner_key, position);"
+            "CREATE INDEX IF NOT EXISTS idx_listing_series ON listing_series (series, listing_id);"
+            # Tables of earlier mirrors that no lookup reads
+            "DROP TABLE IF EXISTS listing_words;"
+            "DROP TABLE IF EXISTS listing_releases;"
+        )
+        self._add_model_key()
+
+    def _add_model_key(self):
+        """Add the lowercased model name to a mirror synced before it was stored."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(listings)")]
+        if "model_key" in columns:
+            return
+        with self._conn:
+            self._conn.execute("ALTER TABLE listings ADD COLUMN model_key TEXT NOT NULL DEFAULT ''")
+            # Lowercased in Python, SQLite lower() only folds ASCII letters
+            self._conn.executemany("UPDATE listings SET model_key = ? WHERE id = ?",
+                                   [(model.lower(), listing_id) for listing_id, model in self._conn.execute("SELECT id, model FROM listings")])
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        """Time of the last sync, or None when the mirror was never synced."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_info WHERE key = 'synced_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def replace(self, rows: Iterable[Dict], partners: Optional[List[str]] = None) -> int:
+        """Replace the stored listings of partners, or all listings, with rows.
+
+        rows may be a lazy page walk. Everything is written in one transaction,
+        so a sync that fails halfway leaves the previous mirror untouched.
+        Returns the number of listings stored.
+        """
+        stored = 0
+        with self._lock, self._conn:
+            if partners:
+                keys = [partner.lower() for partner in partners]
+                marks = ", ".join("?" * len(keys))
+                old_ids = f"SELECT id FROM listings WHERE partner_key IN ({marks})"
+                self._conn.execute(f"DELETE FROM listing_series WHERE listing_id IN ({old_ids})", keys)
+                self._conn.execute(f"DELETE FROM listings WHERE partner_key IN ({marks})", keys)
+            else:
+                for table in ("listings", "listing_series"):
+                    self._conn.execute(f"DELETE FROM {table}")
+
+            # New listings go after the kept ones, in the order the guide returned them
+            position = self._conn.execute("SELECT COALESCE(MAX(position), 0) FROM listings").fetchone()[0]
+            for item in rows:
+                position += 1
+                partner = item.get('partnerName') or ''
+                model = item.get('model') or ''
+                listing_id = self._conn.execute(
+                    "INSERT INTO listings (position, partner, partner_key, model, model_key, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    (position, partner, partner.lower(), model, model.lower(), json.dumps(item))
+                ).lastrowid
+
+                series = {key for cpu in item.get('cpuSeries', []) for key in guide_series_keys(cpu.get('name', ''))}
+                self._conn.executemany("INSERT INTO listing_series (series, listing_id) VALUES (?, ?)",
+                                       ((key, listing_id) for key in series))
+                stored += 1
+
+            self._conn.execute("INSERT OR REPLACE INTO sync_info (key, value) VALUES ('synced_at', ?)", (str(time.time()),))
+        return stored
+
+    def search(self, payload: dict, series: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Yield the listings matching a compatibility guide search payload, in guide order.
+
+        Partners must match exactly, ignoring case, and every keyword must be
+        part of the model name, as in the live guide search. With series, only
+        the listings supporting at least one of these CPU series keys are returned.
+        """
+        partners = [value.lower() for f in payload.get('filters', []) if f.get('displayKey') == 'partnerName'
+                    for value in f.get('filterValues', [])]
+        keywords = [keyword.lower() for keyword in payload.get('keyword', []) if keyword]
+
+        query = "SELECT data FROM listings WHERE 1 = 1"
+        params = []
+        if partners:
+            query += f" AND partner_key IN ({', '.join('?' * len(partners))})"
+            params.extend(partners)
+        for keyword in keywords:
+            query += " AND instr(model_key, ?) > 0"
+            params.append(keyword)
+        if series is not None:
+            series = list(series)
+            query += f" AND id IN (SELECT listing_id FROM listing_series WHERE series IN ({', '.join('?' * len(series))}))"
+            params.extend(series)
+        query += " ORDER BY position"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
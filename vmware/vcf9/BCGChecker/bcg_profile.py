@@ -0,0 +1,223 @@
+"""
+Run instrumentation for BCGChecker
+
+Profiler hooks into the requests sessions of a run and records, per endpoint,
+the number of requests, errors, retries, response body bytes and the response
+latencies. Body bytes are counted after decompression, for streamed responses
+as well, so they compare across runs whatever the transfer encoding. start_phase() measures the wall time of consecutive parts of the run
+together with the requests completed during each of them, stage() adds up the
+busy time of work that overlaps across threads, such as page fetches or guide
+lookups. The report is written as JSON by --profile.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+                        install requirements
+"""
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import json
+import math
+import re
+import threading
+import time
+
+import requests
+
+# Path segments that identify a single resource, collapsed so requests group by endpoint
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F-]{16,}$")
+
+
+def endpoint_name(url: str) -> str:
+    """Return the path of a url with resource identifiers replaced by {id}."""
+    parts = urlsplit(url).path.split("/")
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in parts)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    """Requests sent to one endpoint."""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    body_bytes: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+
+@dataclass
+class StageStats:
+    """Calls of one stage and the seconds spent in them, summed across threads."""
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+class Profiler:
+    """Thread safe recorder of the phases and HTTP requests of a run."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.phases = []
+        self.counters: Dict[str, int] = {}
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._phase = None
+
+    def attach(self, session: requests.Session):
+        """Record every response received through session."""
+        session.hooks["response"].append(self.on_response)
+
+    def on_response(self, response: requests.Response, *args, **kwargs):
+        name = endpoint_name(response.url)
+        if not kwargs.get("stream"):
+            size = len(response.content)
+        else:
+            # A streamed body is read by the caller, its size is known once the response is closed
+            size = 0
+            self._count_on_close(name, response)
+        retries = getattr(response.raw, "retries", None)
+        retried = len(retries.history) if retries is not None else 0
+
+        with self._lock:
+            stats = self._endpoint(name)
+            stats.requests += 1
+            stats.errors += response.status_code >= 400
+            stats.retries += retried
+            stats.body_bytes += size
+            stats.latencies.append(response.elapsed.total_seconds() * 1000)
+
+    def _endpoint(self, name: str) -> EndpointStats:
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        return stats
+
+    def _count_on_close(self, name: str, response: requests.Response):
+        """Add the body bytes handed out by iter_content() when a streamed response is closed."""
+        close = response.close
+        iter_content = response.iter_content
+        received = 0
+        counted = False
+
+        def counting_iter_content(*args, **kwargs):
+            nonlocal received
+            for chunk in iter_content(*args, **kwargs):
+                received += len(chunk)
+                yield chunk
+
+        def counting_close():
+            nonlocal counted
+            if not counted:
+                counted = True
+                with self._lock:
+                    self._endpoint(name).body_bytes += received
+            close()
+
+        response.iter_content = counting_iter_content
+        response.close = counting_close
+
+    def _totals(self):
+        with self._lock:
+            return (sum(s.requests for s in self.endpoints.values()),
+                    sum(s.body_bytes for s in self.endpoints.values()),
+                    sum(s.retries for s in self.endpoints.values()))
+
+    def start_phase(self, name: str):
+        """End the running phase and start measuring the next one.
+
+        Requests are counted in the phase during which they completed.
+        """
+        self.stop_phase()
+        self._phase = (name, time.perf_counter(), self._totals())
+
+    def stop_phase(self):
+        """End the running phase, if any."""
+        if self._phase is None:
+            return
+        name, start, (requests_before, bytes_before, retries_before) = self._phase
+        requests_after, bytes_after, retries_after = self._totals()
+        self.phases.append({
+            "phase": name,
+            "seconds": round(time.perf_counter() - start, 3),
+            "requests": requests_after - requests_before,
+            "body_bytes": bytes_after - bytes_before,
+            "retries": retries_after - retries_before
+        })
+        self._phase = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the time spent in the block to a stage, blocks may run in several threads at once."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats()
+                stats.calls += 1
+                stats.errors += failed
+                stats.seconds += elapsed
+
+    def count(self, name: str, value: int):
+        """Store a counter of the run, such as cache hits."""
+        self.counters[name] = value
+
+    def report(self) -> dict:
+        """Return the measurements as a JSON serializable dict."""
+        self.stop_phase()
+        endpoints = {}
+        with self._lock:
+            for name, stats in sorted(self.endpoints.items()):
+                latencies = sorted(stats.latencies)
+                endpoints[name] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "body_bytes": stats.body_bytes,
+                    "latency_ms": {
+                        "p50": round(percentile(latencies, 0.50), 1),
+                        "p95": round(percentile(latencies, 0.95), 1),
+                        "p99": round(percentile(latencies, 0.99), 1),
+                        "max": round(latencies[-1], 1) if latencies else 0.0
+                    }
+                }
+            stages = {
+                name: {"calls": stats.calls, "errors": stats.errors, "seconds": round(stats.seconds, 3)}
+                for name, stats in self.stages.items()
+            }
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "seconds": round(time.perf_counter() - self._start, 3),
+            "phases": self.phases,
+            "endpoints": endpoints,
+            "stages": stages,
+            "counters": self.counters
+        }
+
+    def write(self, filename: str) -> dict:
+        """Write the report to a JSON file and return it."""
+        report = self.report()
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+def profile_stage(profiler: Optional[Profiler], name: str):
+    """Return profiler.stage(name), or a context that does nothing when profiling is off."""
+    return profiler.stage(name) if profiler is not None else nullcontext()
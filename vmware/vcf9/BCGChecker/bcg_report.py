@@ -0,0 +1,103 @@
+"""
+Single pass aggregation of BCGChecker results
+
+HostRecord is the compact per host entry kept for a whole run. aggregate_results
+walks every host once and builds everything the summary tables need. model_rows
+gives the per host rows written by the exporters.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+VCF9 = "VCF 9.0"
+NOT_COMPATIBLE = "NOT COMPATIBLE"
+NOT_FOUND = "NOT FOUND"
+NOT_APPLIED = "NOT APPLIED"
+LOOKUP_ERROR = "LOOKUP ERROR"
+CATEGORIES = (VCF9, NOT_COMPATIBLE, NOT_FOUND, NOT_APPLIED, LOOKUP_ERROR)
+
+
+@dataclass(slots=True)
+class HostRecord:
+    """One ESXi host.
+
+    The vendor, model and CPU strings are interned, and result is the
+    compatibility fields object shared by every host of the same model and CPU.
+    """
+    hostname: str
+    vendor: str
+    model: str
+    cpu: str
+    source: str
+    result: Optional[Dict] = None
+
+
+@dataclass
+class CpuSummary:
+    """Hosts of one (model, CPU) pair."""
+    count: int = 0
+    compatibility: set = field(default_factory=set)
+    vendor_confirmed: set = field(default_factory=set)
+
+
+@dataclass
+class CompatibilityReport:
+    """Aggregated view of the compatibility results of a run."""
+    # (model, cpu) -> summary, in server_models order
+    summary: Dict[Tuple[str, str], CpuSummary] = field(default_factory=dict)
+    # category -> model -> number of hosts
+    categories: Dict[str, Dict[str, int]] = field(default_factory=lambda: {category: {} for category in CATEGORIES})
+    # category -> number of hosts
+    totals: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(CATEGORIES, 0))
+
+
+def as_list(value) -> List[str]:
+    """Return a compatibility or vendor confirmation field as a list of names."""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value] if value else []
+
+
+def categorize(compatibility) -> str:
+    """Return the summary category of a host compatibility field."""
+    if 'Not Applied' in compatibility:
+        return NOT_APPLIED
+    if 'Not Found' in compatibility:
+        return NOT_FOUND
+    if 'Lookup Error' in compatibility:
+        return LOOKUP_ERROR
+    if 'ESXi 9.0' in compatibility:
+        return VCF9
+    return NOT_COMPATIBLE
+
+
+def model_rows(model: str, items: List[HostRecord]) -> Iterator[tuple]:
+    """Yield (hostname, model, cpu, compatibility, vendor confirmation, category, source) for every host of a model."""
+    for item in items:
+        result = item.result or {}
+        compatibility = as_list(result.get('compatibility'))
+        yield (item.hostname, model, item.cpu, compatibility, as_list(result.get('vcfSupportedConfirmWvendor')),
+               categorize(compatibility), item.source)
+
+
+def aggregate_results(server_models: dict) -> CompatibilityReport:
+    """Build per (model, CPU) counts and category totals in one pass over the hosts."""
+    report = CompatibilityReport()
+
+    for model, items in server_models.items():
+        for _, _, cpu, compatibility, vendor_confirmed, category, _ in model_rows(model, items):
+
+            summary = report.summary.get((model, cpu))
+            if summary is None:
+                summary = report.summary[(model, cpu)] = CpuSummary()
+            summary.count += 1
+            summary.compatibility.update(compatibility)
+            summary.vendor_confirmed.update(vendor_confirmed)
+
+            per_model = report.categories[category]
+            per_model[model] = per_model.get(model, 0) + 1
+            report.totals[category] += 1
+
+    return report
@@ -0,0 +1,136 @@
+"""
+Local inventory snapshot for incremental BCGChecker runs
+
+The snapshot keeps the vendor, model and CPU of every host seen in Aria Operations
+and the compatibility result of every server model, so a later run only fetches
+properties of new or changed hosts and only queries models whose CPU set changed.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+"""
+from typing import Dict, Iterable, Optional, Tuple
+import json
+import sqlite3
+import time
+
+DEFAULT_SNAPSHOT_FILE = "bcg_inventory.db"
+# Hours after which the properties of a known host are fetched again
+DEFAULT_SNAPSHOT_MAX_AGE = 168
+
+
+class InventorySnapshot:
+    """SQLite snapshot of the hosts and model results of the previous runs."""
+
+    def __init__(self, db_path: str, max_age_hours: float = DEFAULT_SNAPSHOT_MAX_AGE):
+        self.db_path = db_path
+        self.max_age = max_age_hours * 3600
+        self.started = time.time()
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS hosts ("
+            "identifier TEXT PRIMARY KEY, "
+            "hostname TEXT NOT NULL, "
+            "vendor TEXT NOT NULL, "
+            "model TEXT NOT NULL, "
+            "cpu TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, "
+            "last_seen REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS models ("
+            "model TEXT PRIMARY KEY, "
+            "signature TEXT NOT NULL, "
+            "result TEXT NOT NULL, "
+            "checked_at REAL NOT NULL);"
+        )
+
+        # The previous state is loaded once so worker threads can read it without touching SQLite
+        self._previous: Dict[str, tuple] = {}
+        for row in self._conn.execute("SELECT identifier, hostname, vendor, model, cpu, fetched_at, last_seen FROM hosts"):
+            self._previous[row[0]] = row[1:]
+        self._models: Dict[str, tuple] = {}
+        for row in self._conn.execute("SELECT model, signature, result, checked_at FROM models"):
+            self._models[row[0]] = (row[1], json.loads(row[2]), row[3])
+
+        self._seen: Dict[str, tuple] = {}
+        self._model_updates: Dict[str, tuple] = {}
+        self.added = []
+        self.changed = []
+
+    def reusable(self, identifier: str, hostname: str) -> Optional[Tuple[str, str, str]]:
+        """Return the stored (vendor, model, cpu) of a host when it can be reused without fetching its properties."""
+        previous = self._previous.get(identifier)
+        if previous is None:
+            return None
+        prev_hostname, vendor, model, cpu, fetched_at, _ = previous
+        if prev_hostname != hostname or self.started - fetched_at > self.max_age:
+            return None
+        return vendor, model, cpu
+
+    def record_host(self, identifier: str, hostname: str, vendor: str, model: str, cpu: str, fetched: bool):
+        """Record a host seen in this run and track whether it is new or changed."""
+        previous = self._previous.get(identifier)
+        fetched_at = self.started if fetched or previous is None else previous[4]
+        self._seen[identifier] = (hostname, vendor, model, cpu, fetched_at, self.started)
+
+        if previous is None:
+            self.added.append(hostname)
+        elif previous[:4] != (hostname, vendor, model, cpu):
+            self.changed.append(hostname)
+
+    def keep_host(self, identifier: str):
+        """Carry the previous record of a host over when its properties could not be fetched in this run.
+
+        The host was seen in this run, only its stored properties are kept.
+        """
+        previous = self._previous.get(identifier)
+        if previous is not None:
+            self._seen[identifier] = (*previous[:5], self.started)
+
+    def keep_unseen(self):
+        """Carry every previous host not seen in this run over, for runs where an inventory source could not be read.
+
+        They keep the time they were last seen.
+        """
+        for identifier, previous in self._previous.items():
+            self._seen.setdefault(identifier, previous)
+
+    @property
+    def removed(self):
+        return sorted(self._previous[identifier][0] for identifier in self._previous.keys() - self._seen.keys())
+
+    @staticmethod
+    def _signature(cpus: Iterable[str]) -> str:
+        return json.dumps(sorted(set(cpus)))
+
+    def has_model(self, model: str) -> bool:
+        """Return True when a result of the model is stored."""
+        return model in self._models
+
+    def model_result(self, model: str, cpus: Iterable[str], ttl_hours: float) -> Optional[Dict[str, Dict]]:
+        """Return the stored result of a model when its CPU set is unchanged and the result is younger than ttl_hours."""
+        stored = self._models.get(model)
+        if stored is None:
+            return None
+        signature, result, checked_at = stored
+        if signature != self._signature(cpus) or self.started - checked_at > ttl_hours * 3600:
+            return None
+        return result
+
+    def record_model(self, model: str, result: Dict[str, Dict]):
+        """Record the result of a model lookup done in this run."""
+        self._model_updates[model] = (self._signature(result), result)
+
+    def save(self):
+        """Write the hosts and model results of this run, dropping hosts that were not seen or carried over."""
+        with self._conn:
+            self._conn.execute("DELETE FROM hosts")
+            self._conn.executemany(
+                "INSERT INTO hosts (identifier, hostname, vendor, model, cpu, fetched_at, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((identifier, *record) for identifier, record in self._seen.items())
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO models (model, signature, result, checked_at) VALUES (?, ?, ?, ?)",
+                ((model, signature, json.dumps(result), self.started) for model, (signature, result) in self._model_updates.items())
+            )
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Aria Operations suite-api and the Broadcom Compatibility Guide
+
+Serves a synthetic fleet so BCGChecker.py and ListVcentersFromAria.py can be run
+and measured without live endpoints. Emulated endpoints:
+    POST /suite-api/api/auth/token/acquire
+    GET  /suite-api/api/resources
+    GET  /suite-api/api/resources/{id}/properties
+    GET  /suite-api/api/resources/properties
+    POST /suite-api/api/resources/properties/latest/query
+    GET  /suite-api/api/adapterkinds
+    GET  /suite-api/api/adapters
+    POST /compguide/programs/viewResults
+    GET  /__stats                              request counters per endpoint
+    POST /__stats/reset
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+
+Examples:
+  python3 mock_server.py --hosts 10000 --latency 20
+  python3 ../BCGChecker.py -H http://127.0.0.1:8080 -u admin -p x -d local --guide-url http://127.0.0.1:8080/compguide/programs/viewResults
+"""
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import threading
+import time
+import uuid
+
+# vendorModel reported by Aria, compatibility guide partner and model name
+MODELS = [
+    ("Dell Inc. PowerEdge R640", "Dell", "PowerEdge R640"),
+    ("Dell Inc. PowerEdge R650", "Dell", "PowerEdge R650"),
+    ("Dell Inc. PowerEdge R740", "Dell", "PowerEdge R740"),
+    ("Dell Inc. PowerEdge R750", "Dell", "PowerEdge R750"),
+    ("Dell Inc. PowerEdge R7525", "Dell", "PowerEdge R7525"),
+    ("Dell Inc. PowerEdge R760", "Dell", "PowerEdge R760"),
+    ("HPE ProLiant DL360 Gen10", "Hewlett Packard Enterprise", "DL360 Gen10"),
+    ("HPE ProLiant DL380 Gen10", "Hewlett Packard Enterprise", "DL380 Gen10"),
+    ("HPE ProLiant DL380 Gen11", "Hewlett Packard Enterprise", "DL380 Gen11"),
+    ("HPE ProLiant DL385 Gen10 Plus", "Hewlett Packard Enterprise", "DL385 Gen10 Plus"),
+    ("Lenovo ThinkSystem SR650", "Lenovo ThinkSystem", "SR650"),
+    ("Cisco Systems Inc UCSC-C240-M5SX", "Cisco Systems", "Inc UCSC-C240-M5SX"),
+    ("VMware, Inc. VMware7,1", "VMware,", "Inc. VMware7,1"),
+]
+
+# Host CPU model and the guide CPU series it belongs to
+CPUS = [
+    ("Intel(R) Xeon(R) Gold 6138 CPU @ 2.00GHz", "Intel Xeon Gold 6100 Series"),
+    ("Intel(R) Xeon(R) Gold 6248R CPU @ 3.00GHz", "Intel Xeon Gold 6200 Series"),
+    ("Intel(R) Xeon(R) Silver 4214 CPU @ 2.20GHz", "Intel Xeon Silver 4200 Series"),
+    ("Intel(R) Xeon(R) Platinum 8358 CPU @ 2.60GHz", "Intel Xeon Platinum 8300 Series"),
+    ("Intel(R) Xeon(R) Gold 6430", "Intel Xeon Gold 6400/5400 Series"),
+    ("Intel(R) Xeon(R) CPU E5-2680 v4 @ 2.40GHz", "Intel Xeon E5-2600-v4 Series"),
+    ("AMD EPYC 7543 32-Core Processor", "AMD EPYC 7003 Series"),
+    ("AMD EPYC 7502 32-Core Processor", "AMD EPYC 7002 Series"),
+]
+
+# Series that already lost ESXi 9 support in the synthetic catalog
+LEGACY_SERIES = {"Intel Xeon E5-2600-v4 Series", "Intel Xeon Gold 6100 Series"}
+
+
+def build_catalog(listings_per_model: int):
+    """Build the synthetic compatibility guide listings of every model."""
+    catalog = []
+    for _, partner, model in MODELS:
+        # Unrelated listings first, so matching rows only show up on later pages
+        for variant in range(max(0, listings_per_model - len(CPUS))):
+            catalog.append({
+                "partnerName": partner,
+                "model": f"{model} Variant {variant}",
+                "cpuSeries": [{"name": "Intel Xeon E7-8800 Series"}],
+                "supportedReleases": [{"name": "ESXi 6.7"}, {"name": "ESXi 6.5"}],
+                "vcfSupportedConfirmWvendor": [{"name": ""}]
+            })
+        for _, series in CPUS:
+            releases = ["ESXi 8.0 U3", "ESXi 8.0"] if series in LEGACY_SERIES else ["ESXi 9.0", "ESXi 8.0 U3", "ESXi 8.0"]
+            catalog.append({
+                "partnerName": partner,
+                "model": model,
+                "cpuSeries": [{"name": series}],
+                "supportedReleases": [{"name": release} for release in releases],
+                "vcfSupportedConfirmWvendor": [{"name": f"{partner}\nConfirmed by partner"}]
+            })
+    return catalog
+
+
+class Fleet:
+    """Synthetic hosts, properties, vCenter adapters and compatibility catalog."""
+
+    def __init__(self, hosts: int, extra_properties: int = 50, listings_per_model: int = 60, vcenters: int = 20):
+        self.hosts = hosts
+        self.extra_properties = extra_properties
+        self.vcenters = vcenters
+        self.catalog = build_catalog(listings_per_model)
+        self.tokens = set()
+
+    @staticmethod
+    def identifier(index: int) -> str:
+        return str(uuid.UUID(int=index + 1))
+
+    @staticmethod
+    def index(identifier: str) -> int:
+        return uuid.UUID(identifier).int - 1
+
+    def resource(self, index: int) -> dict:
+        return {
+            "identifier": self.identifier(index),
+            "resourceKey": {
+                "name": f"esx{index:06d}.lab.local",
+                "adapterKindKey": "VMWARE",
+                "resourceKindKey": "HostSystem"
+            },
+            "resourceStatusStates": [],
+            "resourceHealth": "GREEN"
+        }
+
+    def properties(self, identifier: str) -> list:
+        index = self.index(identifier)
+        vendor_model = MODELS[index % len(MODELS)][0]
+        cpu = CPUS[(index // len(MODELS)) % len(CPUS)][0]
+        properties = [{"name": f"config|extra|property{i:03d}", "value": f"value {i}"} for i in range(self.extra_properties)]
+        properties += [
+            {"name": "cpu|cpuModel", "value": cpu},
+            {"name": "hardware|vendor", "value": vendor_model.split()[0]},
+            {"name": "hardware|vendorModel", "value": vendor_model},
+            {"name": "summary|version", "value": "8.0.3"},
+        ]
+        return sorted(properties, key=lambda prop: prop["name"])
+
+    def adapters(self) -> list:
+        adapters = []
+        for index in range(self.vcenters):
+            adapters.append({
+                "id": str(uuid.UUID(int=10 ** 9 + index)),
+                "resourceKey": {
+                    "name": f"vcenter{index:02d}",
+                    "adapterKindKey": "VMWARE",
+                    "resourceKindKey": "VMwareAdapter Instance",
+                    "resourceIdentifiers": [
+                        {"identifierType": {"name": "VCURL"}, "value": f"vcenter{index:02d}.lab.local"},
+                        {"identifierType": {"name": "VMEntityVCID"}, "value": str(uuid.UUID(int=2 * 10 ** 9 + index))},
+                    ]
+                }
+            })
+        return adapters
+
+    def search(self, payload: dict) -> list:
+        partners = [value.lower() for f in payload.get("filters", []) for value in f.get("filterValues", [])]
+        keywords = [keyword.lower() for keyword in payload.get("keyword", []) if keyword]
+        rows = []
+        for listing in self.catalog:
+            if partners and listing["partnerName"].lower() not in partners:
+                continue
+            if any(keyword not in listing["model"].lower() for keyword in keywords):
+                continue
+            rows.append(listing)
+        return rows
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _authorized(self) -> bool:
+        scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        return scheme in ("OpsToken", "vRealizeOpsToken") and token in self.server.fleet.tokens
+
+    def _count(self, endpoint: str):
+        with self.server.lock:
+            self.server.stats[endpoint] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fleet = self.server.fleet
+        parts = url.path.rstrip("/").split("/")
+
+        if url.path == "/__stats":
+            with self.server.lock:
+                return self._send(200, dict(self.server.stats))
+
+        if url.path == "/suite-api/api/resources":
+            self._count("resources")
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            page = int(query.get("page", ["0"])[0])
+            page_size = min(int(query.get("pageSize", ["1000"])[0]), self.server.max_page_size)
+            indexes = range(page * page_size, min(fleet.hosts, (page + 1) * page_size))
+            return self._send(200, {
+                "pageInfo": {"totalCount": fleet.hosts, "page": page, "pageSize": page_size},
+                "resourceList": [fleet.resource(index) for index in indexes]
+            })
+
+        if url.path == "/suite-api/api/resources/properties":
+            self._count("properties-bulk")
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            return self._send(200, {"resourcePropertiesList": [
+                {"resourceId": identifier, "property": fleet.properties(identifier)}
+                for identifier in query.get("resourceId", [])
+            ]})
+
+        if len(parts) == 6 and parts[:4] == ["", "suite-api", "api", "resources"] and parts[5] == "properties":
+            self._count("properties")
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            return self._send(200, {"resourceId": parts[4], "property": fleet.properties(parts[4])})
+
+        if url.path == "/suite-api/api/adapterkinds":
+            self._count("adapterkinds")
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            return self._send(200, {"adapter-kind": [{"key": "VMWARE", "name": "vCenter"}, {"key": "vRealizeOpsMgrAPI", "name": "vRealizeOpsMgrAPI"}]})
+
+        if url.path == "/suite-api/api/adapters":
+            self._count("adapters")
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            return self._send(200, {"adapterInstancesInfoDto": fleet.adapters()})
+
+        return self._send(404, {"message": f"Unknown endpoint {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fleet = self.server.fleet
+
+        if url.path == "/__stats/reset":
+            with self.server.lock:
+                self.server.stats.clear()
+            return self._send(200, {})
+
+        if url.path == "/suite-api/api/auth/token/acquire":
+            self._count("token")
+            self._read_json()
+            token = str(uuid.uuid4())
+            fleet.tokens.add(token)
+            validity = int((time.time() + 6 * 3600) * 1000)
+            return self._send(200, {"token": token, "validity": validity, "expiresAt": time.strftime("%A, %B %d, %Y at %I:%M:%S %p %Z", time.localtime(validity / 1000)), "roles": []})
+
+        if url.path == "/compguide/programs/viewResults":
+            self._count("viewResults")
+            rows = fleet.search(self._read_json())
+            limit = int(query.get("limit", ["20"])[0])
+            page = int(query.get("page", ["1"])[0])
+            return self._send(200, {"data": {"count": len(rows), "fieldValues": rows[(page - 1) * limit:page * limit]}})
+
+        if url.path == "/suite-api/api/resources/properties/latest/query" and self.server.property_query:
+            self._count("properties-query")
+            body = self._read_json()
+            if not self._authorized():
+                return self._send(401, {"message": "Unauthorized"})
+            keys = set(body.get("propertyKeys") or [])
+            timestamp = int(time.time() * 1000)
+            return self._send(200, {"values": [
+                {
+                    "resourceId": identifier,
+                    "property-contents": {"property-content": [
+                        {"statKey": prop["name"], "timestamps": [timestamp], "values": [prop["value"]]}
+                        for prop in fleet.properties(identifier) if not keys or prop["name"] in keys
+                    ]}
+                }
+                for identifier in body.get("resourceIds", [])
+            ]})
+
+        # Drain the body so the connection can be reused
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        return self._send(404, {"message": f"Unknown endpoint {url.path}"})
+
+
+class MockServer:
+    """Run the mock endpoints in a background thread."""
+
+    def __init__(self, fleet: Fleet, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0, max_page_size: int = 1000,
+                 property_query: bool = True):
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fleet = fleet
+        self.httpd.latency = latency_ms / 1000
+        self.httpd.max_page_size = max_page_size
+        self.httpd.property_query = property_query
+        self.httpd.stats = Counter()
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def guide_url(self) -> str:
+        return f"{self.url}/compguide/programs/viewResults"
+
+    def stats(self) -> Counter:
+        with self.httpd.lock:
+            return Counter(self.httpd.stats)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic Aria Operations and Compatibility Guide')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--hosts', type=int, default=1000, help='Number of ESXi hosts in the fleet (default: 1000)')
+    parser.add_argument('--latency', type=float, default=0, help='Added latency per request in milliseconds (default: 0)')
+    parser.add_argument('--extra-properties', type=int, default=50, help='Unrelated properties per host (default: 50)')
+    parser.add_argument('--listings-per-model', type=int, default=60, help='Compatibility guide listings per model (default: 60)')
+    parser.add_argument('--max-page-size', type=int, default=1000, help='Largest resources page served (default: 1000)')
+    parser.add_argument('--no-property-query', action='store_true', help='Answer the latest properties query with 404, like older releases')
+    args = parser.parse_args()
+
+    fleet = Fleet(args.hosts, args.extra_properties, args.listings_per_model)
+    server = MockServer(fleet, args.bind, args.port, args.latency, args.max_page_size, not args.no_property_query)
+    print(f"[*] Serving {args.hosts} hosts on {server.url}")
+    print(f"[*] Compatibility guide url: {server.guide_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Stopped.")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Record/replay HTTP layer for the BCGChecker benchmarks
+
+RecordReplayAdapter is a requests transport adapter. In "live" mode it only counts
+requests, in "record" mode it also stores every response in a cassette file, and
+in "replay" mode it answers from the cassette without any network access.
+install() routes every requests call through the adapter, including the module
+level requests.get/post helpers, so the scripts run unmodified.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+                        install requirements
+"""
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import hashlib
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+def _request_key(request) -> str:
+    # The server address is left out so a cassette replays against any base url
+    url = urlsplit(request.url)
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    return f"{request.method} {url.path}?{url.query} {hashlib.sha256(body).hexdigest()}"
+
+
+def endpoint_name(url: str) -> str:
+    """Collapse resource identifiers so requests group by endpoint."""
+    parts = urlsplit(url).path.split("/")
+    if len(parts) == 6 and parts[3] == "resources" and parts[5] == "properties":
+        parts[4] = "{id}"
+    return "/".join(parts)
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """Transport adapter that counts, records or replays requests."""
+
+    def __init__(self, mode: str = "live", cassette: str = None, **kwargs):
+        super().__init__(**kwargs)
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Unknown mode {mode}")
+        self.mode = mode
+        self.cassette = cassette
+        self.requests = Counter()
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        if mode == "replay":
+            with open(cassette, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests[endpoint_name(request.url)] += 1
+
+        if self.mode == "replay":
+            response = self._replay(request)
+        else:
+            response = super().send(request, **kwargs)
+            if self.mode == "record":
+                self._record(request, response)
+
+        # Content-Length keeps streamed bodies unread, replayed and recorded bodies are in memory already
+        size = response.headers.get("Content-Length")
+        size = int(size) if size is not None and self.mode == "live" else len(response.content)
+        with self._lock:
+            self.bytes_received += size
+        return response
+
+    def _record(self, request, response):
+        entry = {
+            "key": _request_key(request),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in ("content-encoding", "transfer-encoding", "content-length")},
+            "body": response.content.decode("utf-8", "replace")
+        }
+        with self._lock:
+            self._entries.setdefault(entry["key"], entry)
+
+    def _replay(self, request):
+        entry = self._entries.get(_request_key(request))
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {request.method} {request.url}", request=request)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def save(self):
+        """Write the recorded responses to the cassette file."""
+        if self.mode != "record":
+            return
+        with self._lock, open(self.cassette, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + "\n")
+
+
+@contextmanager
+def install(adapter: RecordReplayAdapter):
+    """Send every requests call made inside the block through adapter."""
+    original = requests.sessions.Session.get_adapter
+
+    def get_adapter(self, url):
+        return adapter
+
+    requests.sessions.Session.get_adapter = get_adapter
+    try:
+        yield adapter
+    finally:
+        requests.sessions.Session.get_adapter = original
+        adapter.save()
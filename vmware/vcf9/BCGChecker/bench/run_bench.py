@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for BCGChecker.py and ListVcentersFromAria.py against the local mock server
+
+For each fleet size a mock Aria Operations + Compatibility Guide is started and every
+phase of a run is measured: wall time, number of requests, bytes received and
+peak Python memory.
+
+Author: Thomas Rodrigues (@L4nzN0t_)
+Required Dependencies:  python3.10 or higher
+                        install requirements
+
+Examples:
+  python3 run_bench.py
+  python3 run_bench.py --hosts 1000 10000 50000 --latency 5 --workers 16
+  python3 run_bench.py --hosts 1000 --record bench_1k.jsonl
+  python3 run_bench.py --hosts 1000 --replay bench_1k.jsonl --json results.json
+"""
+from os import path
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+BENCH_DIR = path.dirname(path.abspath(__file__))
+sys.path.insert(0, path.join(BENCH_DIR, ".."))
+sys.path.insert(0, path.join(BENCH_DIR, "..", "..", "..", "aria", "ListvCentersFromAria"))
+
+from mock_server import Fleet, MockServer
+from recorder import RecordReplayAdapter, install
+import BCGChecker
+from bcg_export import create_exporter
+from bcg_report import aggregate_results, model_rows, VCF9
+from ListVcentersFromAria import AriaOperationsAPI
+
+# Address used in replay mode, nothing listens on it
+REPLAY_URL = "http://127.0.0.1:9"
+
+
+class PhaseRecorder:
+    """Measure wall time, requests, bytes and peak memory of consecutive phases."""
+
+    def __init__(self, adapter: RecordReplayAdapter):
+        self.adapter = adapter
+        self.results = []
+
+    def run(self, name: str, func, *args, **kwargs):
+        requests_before = sum(self.adapter.requests.values())
+        bytes_before = self.adapter.bytes_received
+        tracemalloc.reset_peak()
+        base_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+
+        result = func(*args, **kwargs)
+
+        elapsed = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] - base_memory
+        self.results.append({
+            "phase": name,
+            "seconds": round(elapsed, 3),
+            "requests": sum(self.adapter.requests.values()) - requests_before,
+            "bytes": self.adapter.bytes_received - bytes_before,
+            "peak_memory_mb": round(peak_memory / 1024 / 1024, 2)
+        })
+        return result
+
+
+def run_size(hosts: int, args) -> dict:
+    """Run every phase against a fleet of the given size and return the measurements."""
+    server = None
+    if args.replay:
+        base_url = REPLAY_URL
+        adapter = RecordReplayAdapter("replay", args.replay, pool_maxsize=64)
+    else:
+        fleet = Fleet(hosts, args.extra_properties, args.listings_per_model)
+        server = MockServer(fleet, latency_ms=args.latency).start()
+        base_url = server.url
+        adapter = RecordReplayAdapter("record" if args.record else "live", args.record, pool_maxsize=64)
+
+    recorder = PhaseRecorder(adapter)
+    try:
+        with install(adapter), tempfile.TemporaryDirectory(prefix="bcg_bench_") as output_dir:
+            aria_client = BCGChecker.AriaOpsClient(base_url, "admin", "local", "secret", verify_ssl=False, workers=args.workers)
+            recorder.run("authenticate", aria_client.authenticate)
+            host_list = recorder.run("enumerate hosts", lambda: list(aria_client.iter_hosts(args.page_size)))
+            servers, server_models = recorder.run("host properties", aria_client.extract_server_models, host_list, False, args.batch_size)
+            server_models = dict(sorted(server_models.items()))
+
+            guide_url = f"{base_url}/compguide/programs/viewResults"
+            compatibility_client = BCGChecker.VCFCompatibility(None, args.guide_workers, 0, guide_url=guide_url)
+            exporter = create_exporter("csv", path.join(output_dir, "server_export.csv"))
+            recorder.run("compatibility + export", compatibility_client.check_vcf_compatibility, server_models,
+                         on_model=lambda key, items: exporter.write_rows(model_rows(key, items)))
+            exporter.close()
+            compatibility_client.close()
+            report = recorder.run("aggregate", aggregate_results, server_models)
+
+            vcenter_client = AriaOperationsAPI(base_url, "admin", "secret", "local", verify_ssl=False)
+            recorder.run("vcenters: authenticate", vcenter_client.get_token)
+            recorder.run("vcenters: list", vcenter_client.extract_vcenter_fqdns)
+    finally:
+        if server is not None:
+            server.stop()
+
+    return {
+        "hosts": hosts,
+        "hosts_found": sum(len(items) for items in server_models.values()),
+        "models": len(server_models),
+        "vcf9_hosts": report.totals[VCF9],
+        "phases": recorder.results,
+        "requests_by_endpoint": dict(adapter.requests)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BCGChecker against a local mock Aria Operations and Compatibility Guide')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 10000, 50000], help='Fleet sizes to run (default: 1000 10000 50000)')
+    parser.add_argument('--latency', type=float, default=0, help='Added latency per mock request in milliseconds (default: 0)')
+    parser.add_argument('--extra-properties', type=int, default=50, help='Unrelated properties per host (default: 50)')
+    parser.add_argument('--listings-per-model', type=int, default=60, help='Compatibility guide listings per model (default: 60)')
+    parser.add_argument('--workers', type=int, default=BCGChecker.DEFAULT_WORKERS, help='Aria property workers')
+    parser.add_argument('--batch-size', type=int, default=BCGChecker.DEFAULT_BATCH_SIZE, help='Hosts per bulk properties request')
+    parser.add_argument('--page-size', type=int, default=BCGChecker.DEFAULT_PAGE_SIZE, help='Hosts per enumeration page')
+    parser.add_argument('--guide-workers', type=int, default=BCGChecker.DEFAULT_GUIDE_WORKERS, help='Compatibility guide workers')
+    parser.add_argument('--record', help='Record every response of the run to this cassette file (single fleet size)')
+    parser.add_argument('--replay', help='Replay responses from this cassette file instead of starting the mock server (single fleet size)')
+    parser.add_argument('--json', help='Write the measurements to this JSON file')
+    args = parser.parse_args()
+
+    if (args.record or args.replay) and len(args.hosts) != 1:
+        parser.error("--record and --replay take a single --hosts value")
+
+    tracemalloc.start()
+    results = []
+    for hosts in args.hosts:
+        print(f"[*] Running fleet of {hosts} hosts...")
+        result = run_size(hosts, args)
+        results.append(result)
+
+        table = [[p["phase"], p["seconds"], p["requests"], p["bytes"], p["peak_memory_mb"]] for p in result["phases"]]
+        print(tabulate(table, headers=["Phase", "Seconds", "Requests", "Bytes", "Peak MB"], tablefmt="simple_grid"))
+        print(f"[*] {result['hosts_found']} hosts, {result['models']} models, {result['vcf9_hosts']} VCF 9.0 hosts\n")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[+] Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,136 +1,741 @@
 #!/usr/bin/env python3
 """
-Measures average latency between two nodes over a specified time period.
+Measures average latency between a node and one or more targets over a specified time period.
+
+Every target is probed concurrently with its own cadence, 1 second by default,
+and its own statistics, and all targets are reported together at the end of the
+run. In daemon mode the run lasts until stopped and 1m/5m/15m rolling window
+statistics are reported periodically while probing continues. By
+default one long-lived ping process per target streams its replies, which are
+matched to their requests by sequence number to find the lost ones. The native
+engine sends the echo requests of every target from this process instead, on
+Linux unprivileged ICMP sockets (net.ipv4.ping_group_range).
 
 Author: Thomas Rodrigues (@L4nzN0t_)
 Required Dependencies: python3.10 or higher
 
-VERSION 1.0.0
+VERSION 1.5.0
 """
 
-import subprocess
+import asyncio
+import signal
+import socket
+import struct
+import os
 import re
 import time
 import argparse
 import sys
-from statistics import mean, stdev
+import math
+from array import array
+
+# Ping processes allowed to run at the same time across all targets
+DEFAULT_MAX_CONCURRENT = 64
+
+# persistent keeps one ping process per target, oneshot starts one per sample,
+# native sends the echo requests of every target from this process
+ENGINES = ['persistent', 'oneshot', 'native']
+# Windows ping does not number its replies
+DEFAULT_ENGINE = 'oneshot' if sys.platform.startswith('win') else 'persistent'
+
+# First icmp_seq sent by ping, and the value at which it wraps around
+ICMP_SEQ_BASE = 0 if sys.platform == 'darwin' else 1
+ICMP_SEQ_WRAP = 65536
+
+# ICMP echo request and reply types, for IPv4 and IPv6
+ICMP_ECHO = {socket.AF_INET: (8, 0), socket.AF_INET6: (128, 129)}
+# Echo payload after the 8 byte target token, 56 bytes in total like ping
+ICMP_PADDING = bytes(range(48))
+
+# Latency histogram, from 1 microsecond up to about 100 seconds with 2% wide buckets
+HISTOGRAM_MIN_MS = 0.001
+HISTOGRAM_LOG_GROWTH = math.log(1.02)
+HISTOGRAM_BUCKETS = int(math.log(100000 / HISTOGRAM_MIN_MS) / HISTOGRAM_LOG_GROWTH) + 1
+PERCENTILES = {'p50': 0.50, 'p90': 0.90, 'p99': 0.99, 'p99_9': 0.999}
+
+# Shortest interval between two pings of a target, in seconds
+MIN_INTERVAL = 0.1
+# Rolling windows reported in daemon mode, in seconds
+WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+# Seconds between two rolling window reports in daemon mode
+DEFAULT_REPORT_INTERVAL = 60
+
+
+def ping_command(host, count=1, timeout=2):
+    # Determine ping command based on OS
+    if sys.platform.startswith('win'):
+        return ['ping', '-n', str(count), '-w', str(timeout * 1000), host]
+    return ['ping', '-c', str(count), '-W', str(timeout), host]
+
+
+def persistent_ping_command(host, interval=1):
+    # Numeric output, no reverse lookup of the replying address on every line
+    return ['ping', '-n', '-i', f'{interval:g}', host]
 
 
-def ping_host(host, count=1, timeout=2):
+def parse_reply(line):
+    """Return (icmp_seq, latency) of a reply line of a persistent ping, or None for other lines."""
+    match = re.search(r'icmp_seq=(\d+).*?time=(\d+(?:\.\d+)?)\s*ms', line)
+    if match:
+        return int(match.group(1)), float(match.group(2))
+    return None
+
+
+def parse_latency(output):
+    # Extract latency from ping output
+    if sys.platform.startswith('win'):
+        # Windows: time=XXms or time<1ms
+        match = re.search(r'time[=<](\d+(?:\.\d+)?)ms', output)
+    else:
+        # Linux/Mac: time=XX.X ms
+        match = re.search(r'time=(\d+(?:\.\d+)?)\s*ms', output)
+
+    if match:
+        return float(match.group(1))
+
+    return None
+
+
+async def ping_host(host, count=1, timeout=2):
     try:
-        # Determine ping command based on OS
-        if sys.platform.startswith('win'):
-            cmd = ['ping', '-n', str(count), '-w', str(timeout * 1000), host]
-        else:
-            cmd = ['ping', '-c', str(count), '-W', str(timeout), host]
-        
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout + 1
+        process = await asyncio.create_subprocess_exec(
+            *ping_command(host, count, timeout),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
-        
-        # Extract latency from ping output
-        if sys.platform.startswith('win'):
-            # Windows: time=XXms or time<1ms
-            match = re.search(r'time[=<](\d+(?:\.\d+)?)ms', result.stdout)
-        else:
-            # Linux/Mac: time=XX.X ms
-            match = re.search(r'time=(\d+(?:\.\d+)?)\s*ms', result.stdout)
-        
-        if match:
-            return float(match.group(1))
-        
+    except OSError:
+        return None
+
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout + 1)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
         return None
-        
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError, ValueError):
+
+    try:
+        return parse_latency(stdout.decode(errors='replace'))
+    except ValueError:
         return None
 
 
-def monitor_latency(source, target, duration_minutes=1, verbose=False):
-    print(f"Monitoring latency from {source} to {target} for {duration_minutes} minute(s)...")
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class IcmpSocketEngine:
+    """Echo requests of every target sent on shared unprivileged ICMP datagram sockets.
+
+    Linux allows them to the groups in net.ipv4.ping_group_range and then sets
+    the identifier of each request itself. Replies are matched to their target
+    by a token in the payload and timestamped with perf_counter_ns as soon as
+    they are read, without any process per target or per sample.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._sockets = {}
+        self._receivers = {}
+        self._next_token = 1
+        self._identifier = os.getpid() & 0xFFFF
+        # Raises OSError when ICMP sockets are not permitted
+        self.socket(socket.AF_INET)
+
+    def socket(self, family):
+        """Return the socket of an address family, opening it the first time."""
+        sock = self._sockets.get(family)
+        if sock is None:
+            protocol = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+            sock = socket.socket(family, socket.SOCK_DGRAM, protocol)
+            sock.setblocking(False)
+            try:
+                self._loop.add_reader(sock.fileno(), self._read, sock, family)
+            except NotImplementedError:
+                sock.close()
+                raise OSError("the event loop cannot watch sockets")
+            self._sockets[family] = sock
+        return sock
+
+    def register(self, queue):
+        """Return the token of a target whose (sequence, received_ns) replies go to queue."""
+        token = self._next_token
+        self._next_token += 1
+        self._receivers[token] = queue
+        return token
+
+    def unregister(self, token):
+        self._receivers.pop(token, None)
+
+    def send(self, family, address, token, sequence):
+        """Send one echo request and return the perf_counter_ns it was sent at."""
+        request_type = ICMP_ECHO[family][0]
+        payload = token.to_bytes(8, 'big') + ICMP_PADDING
+        header = struct.pack('!BBHHH', request_type, 0, 0, self._identifier, sequence)
+        # The kernel computes the IPv6 checksum, Linux also recomputes the IPv4 one
+        checksum = icmp_checksum(header + payload) if family == socket.AF_INET else 0
+        packet = struct.pack('!BBHHH', request_type, 0, checksum, self._identifier, sequence) + payload
+        sent = time.perf_counter_ns()
+        try:
+            self._sockets[family].sendto(packet, address)
+        except OSError:
+            # Such as an unreachable network, the request is reported lost at its deadline
+            pass
+        return sent
+
+    def _read(self, sock, family):
+        reply_type = ICMP_ECHO[family][1]
+        while True:
+            try:
+                data = sock.recv(2048)
+            except BlockingIOError:
+                return
+            except OSError:
+                # ICMP errors, such as host unreachable, are reported on the socket
+                continue
+            received = time.perf_counter_ns()
+
+            # macOS passes the IPv4 header along, Linux only the ICMP message
+            if family == socket.AF_INET and data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 16 or data[0] != reply_type:
+                continue
+            sequence = int.from_bytes(data[6:8], 'big')
+            queue = self._receivers.get(int.from_bytes(data[8:16], 'big'))
+            if queue is not None:
+                queue.put_nowait((sequence, received))
+
+    def close(self):
+        for sock in self._sockets.values():
+            self._loop.remove_reader(sock.fileno())
+            sock.close()
+        self._sockets.clear()
+
+
+def read_targets_file(filename):
+    """Return the targets listed in a file, one per line. Blank lines and # comments are ignored."""
+    targets = []
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                targets.append(line)
+    return targets
+
+
+class LatencyStats:
+    """Running latency statistics of one target in constant memory.
+
+    Mean and variance are updated with Welford's method. Percentiles come from
+    a histogram of logarithmic buckets whose upper bound is 1.02 times their
+    lower bound (HISTOGRAM_LOG_GROWTH is the logarithm of that ratio), so they
+    are within about 1% of the exact value whatever the number of samples.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.mean = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._m2 = 0.0
+        self._buckets = {}
+
+    def add(self, latency):
+        self.count += 1
+        delta = latency - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (latency - self.mean)
+        self.min = min(self.min, latency)
+        self.max = max(self.max, latency)
+
+        bucket = 0
+        if latency > HISTOGRAM_MIN_MS:
+            bucket = min(int(math.log(latency / HISTOGRAM_MIN_MS) / HISTOGRAM_LOG_GROWTH) + 1, HISTOGRAM_BUCKETS)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def add_failure(self):
+        self.failed += 1
+
+    @property
+    def total(self):
+        return self.count + self.failed
+
+    @property
+    def std_dev(self):
+        # Sample standard deviation, as statistics.stdev
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0
+
+    def percentile(self, fraction):
+        """Nearest rank percentile, the geometric middle of its bucket within min and max."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                break
+        value = HISTOGRAM_MIN_MS * math.exp((bucket - 0.5) * HISTOGRAM_LOG_GROWTH) if bucket else HISTOGRAM_MIN_MS
+        return min(max(value, self.min), self.max)
+
+    def summary(self):
+        """Return the statistics of the target, or None when it was never pinged."""
+        if not self.total:
+            return None
+        stats = {
+            'total_pings': self.total,
+            'successful_pings': self.count,
+            'failed_pings': self.failed,
+            'packet_loss': (self.failed / self.total) * 100
+        }
+        if self.count:
+            stats.update({
+                'average': self.mean,
+                'min': self.min,
+                'max': self.max,
+                'std_dev': self.std_dev,
+                **{name: self.percentile(fraction) for name, fraction in PERCENTILES.items()}
+            })
+        return stats
+
+
+def nearest_rank(sorted_values, fraction):
+    return sorted_values[max(1, math.ceil(fraction * len(sorted_values))) - 1]
+
+
+class RollingWindows:
+    """Samples of the last 15 minutes of one target, kept in fixed size ring buffers.
+
+    Each entry is the monotonic time of a sample and its latency, NaN for a
+    lost ping. The buffers hold one entry per ping interval of the longest
+    window, so memory does not grow with the length of the run.
+    """
+
+    def __init__(self, ping_interval):
+        self.capacity = math.ceil(max(WINDOWS.values()) / ping_interval) + 1
+        self._times = array('d', [0.0]) * self.capacity
+        self._latencies = array('d', [0.0]) * self.capacity
+        self._next = 0
+        self._size = 0
+
+    def add(self, latency):
+        self._times[self._next] = time.monotonic()
+        self._latencies[self._next] = math.nan if latency is None else latency
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def summary(self):
+        """Return the statistics of every window, keyed by window name."""
+        now = time.monotonic()
+        windows = sorted(WINDOWS.items(), key=lambda item: item[1])
+        results = {}
+        latencies = []
+        lost = 0
+        # Walk from the newest sample back, closing each window once its samples are passed
+        position = 0
+        for name, seconds in windows:
+            while position < self._size:
+                index = (self._next - 1 - position) % self.capacity
+                if now - self._times[index] >= seconds:
+                    break
+                latency = self._latencies[index]
+                if math.isnan(latency):
+                    lost += 1
+                else:
+                    latencies.append(latency)
+                position += 1
+
+            sent = len(latencies) + lost
+            stats = {'sent': sent, 'packet_loss': (lost / sent) * 100 if sent else 0.0}
+            if latencies:
+                ordered = sorted(latencies)
+                stats.update({
+                    'average': math.fsum(ordered) / len(ordered),
+                    'p50': nearest_rank(ordered, 0.50),
+                    'p99': nearest_rank(ordered, 0.99),
+                    'max': ordered[-1]
+                })
+            results[name] = stats
+        return results
+
+
+def expired(end_time):
+    """True once the monotonic end_time passed, never when the run has no end."""
+    return end_time is not None and time.monotonic() >= end_time
+
+
+def time_remaining(end_time):
+    if end_time is None:
+        return "  -"
+    return f"{max(0, int(end_time - time.monotonic())):3d}s"
+
+
+async def wait_stop(stop, delay):
+    """Sleep for delay seconds, returning True as soon as stop is set."""
+    try:
+        await asyncio.wait_for(stop.wait(), delay)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def oneshot_samples(target, offset, end_time, ping_interval, stop, slots):
+    """Yield (latency, duration) of one new ping process every ping_interval seconds.
+
+    Pings follow a fixed schedule on the monotonic clock, so time spent pinging
+    does not make it drift. Slots missed while a ping was waiting for its
+    timeout are skipped rather than sent in a burst.
+    """
+    start_time = time.monotonic() + offset
+    slot = 0
+    while not stop.is_set():
+        # Wait for next ping, accounting for time spent pinging
+        delay = start_time + slot * ping_interval - time.monotonic()
+        if delay > 0 and await wait_stop(stop, delay):
+            break
+        if expired(end_time):
+            break
+
+        ping_start = time.monotonic()
+        async with slots:
+            latency = await ping_host(target)
+        yield latency, time.monotonic() - ping_start
+        slot = max(slot + 1, math.ceil((time.monotonic() - start_time) / ping_interval))
+
+
+async def persistent_samples(target, offset, end_time, ping_interval, stop, timeout=2):
+    """Yield (latency, duration) of every echo request sent by one long-lived ping process.
+
+    Replies are mapped to their request by icmp_seq. A request with no reply
+    timeout seconds after it was sent is reported as lost, even when no later
+    reply arrives. If ping exits, one failure is reported and it is restarted.
+    """
+    if await wait_stop(stop, offset):
+        return
+    poll = min(ping_interval, 0.2)
+    while not stop.is_set() and not expired(end_time):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *persistent_ping_command(target, ping_interval),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError:
+            process = None
+
+        try:
+            # Requests are numbered from 0 here, in the order ping sends them
+            started = time.monotonic()
+            next_index = 0
+            answered = set()
+            while process is not None and not stop.is_set() and not expired(end_time):
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), poll)
+                except asyncio.TimeoutError:
+                    line = None
+                if line == b'':
+                    break
+                now = time.monotonic()
+
+                if line:
+                    reply = parse_reply(line.decode(errors='replace'))
+                    if reply is not None:
+                        sequence, latency = reply
+                        # icmp_seq is 16 bits, pick the wrap closest to the request expected now
+                        raw = (sequence - ICMP_SEQ_BASE) % ICMP_SEQ_WRAP
+                        expected = (now - started) / ping_interval
+                        index = raw + round((expected - raw) / ICMP_SEQ_WRAP) * ICMP_SEQ_WRAP
+                        if index >= next_index and index not in answered:
+                            answered.add(index)
+                            # Follow the send times of ping itself rather than our own clock
+                            started = now - latency / 1000 - index * ping_interval
+                            yield latency, ping_interval
+
+                # The oldest request without a reply is lost once its deadline passed
+                while True:
+                    if next_index in answered:
+                        answered.remove(next_index)
+                        next_index += 1
+                    elif now >= started + (next_index + 1) * ping_interval + timeout:
+                        yield None, timeout
+                        next_index += 1
+                    else:
+                        break
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        if stop.is_set() or expired(end_time):
+            break
+        # ping could not start or exited, such as when the target does not resolve
+        yield None, 0.0
+        if await wait_stop(stop, ping_interval):
+            break
+
+
+async def native_samples(icmp, target, offset, end_time, ping_interval, stop, timeout=2):
+    """Yield (latency, duration) of every echo request sent to target through icmp.
+
+    Requests follow a fixed schedule on the monotonic clock and are not held
+    back by slow replies. A request with no reply timeout seconds after it was
+    sent is reported as lost. Targets of an address family without a permitted
+    ICMP socket are probed by a persistent ping instead.
+    """
+    if await wait_stop(stop, offset):
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        if stop.is_set() or expired(end_time):
+            return
+        try:
+            family, _, _, _, address = (await loop.getaddrinfo(target, None, type=socket.SOCK_DGRAM))[0]
+            icmp.socket(family)
+            break
+        except socket.gaierror:
+            yield None, 0.0
+            if await wait_stop(stop, ping_interval):
+                return
+        except OSError:
+            async for sample in persistent_samples(target, 0, end_time, ping_interval, stop, timeout):
+                yield sample
+            return
+
+    queue = asyncio.Queue()
+    token = icmp.register(queue)
+    poll = min(ping_interval, 0.2)
+    try:
+        started = time.monotonic()
+        next_index = 0
+        # perf_counter_ns of the requests still waiting for a reply, oldest first
+        sent = {}
+        while not stop.is_set():
+            now = time.monotonic()
+            if now >= started + next_index * ping_interval:
+                if expired(end_time):
+                    break
+                sent[next_index] = icmp.send(family, address, token, next_index % ICMP_SEQ_WRAP)
+                next_index += 1
+
+            while sent:
+                oldest = next(iter(sent))
+                if now < started + oldest * ping_interval + timeout:
+                    break
+                del sent[oldest]
+                yield None, timeout
+
+            wake = started + next_index * ping_interval
+            if sent:
+                wake = min(wake, started + next(iter(sent)) * ping_interval + timeout)
+            try:
+                sequence, received = await asyncio.wait_for(queue.get(), min(max(0, wake - time.monotonic()), poll))
+            except asyncio.TimeoutError:
+                continue
+            # The sequence number is 16 bits, count back from the last request sent
+            index = next_index - 1 - (next_index - 1 - sequence) % ICMP_SEQ_WRAP
+            sent_at = sent.pop(index, None)
+            if sent_at is not None:
+                yield (received - sent_at) / 1e6, ping_interval
+    finally:
+        icmp.unregister(token)
+
+
+async def probe_target(target, samples, end_time, verbose, show_target, windows=None):
+    """Record and print the samples of one target until they end."""
+    stats = LatencyStats()
+    label = f"{target} | " if show_target else ""
+
+    async for latency, ping_duration in samples:
+        if windows is not None:
+            windows.add(latency)
+        if latency is not None:
+            stats.add(latency)
+
+            if verbose:
+                print(f"[{stats.count:4d}] {time.strftime('%H:%M:%S')} | {label}"
+                      f"Latency: {latency:6.2f} ms | "
+                      f"Avg: {stats.mean:6.2f} ms | "
+                      f"Min: {stats.min:6.2f} ms | "
+                      f"Max: {stats.max:6.2f} ms | "
+                      f"Remaining: {time_remaining(end_time)}")
+        else:
+            stats.add_failure()
+            if verbose:
+                print(f"[{stats.total:4d}] {time.strftime('%H:%M:%S')} | {label}"
+                      f"Ping FAILED (timeout: {ping_duration:.2f}s) | "
+                      f"Remaining: {time_remaining(end_time)}")
+            else:
+                print(f"[{stats.total}] {label}Ping failed (timeout or unreachable)")
+
+    return stats.summary()
+
+
+async def print_windows(windows):
+    """Print the rolling window statistics of every target."""
+    print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] ROLLING WINDOWS")
+    width = max(len('Target'), *(len(target) for target in windows))
+    print(f"{'Target':<{width}}  {'Window':>6}  {'Sent':>6}  {'Loss':>7}  {'Avg ms':>8}  {'P50 ms':>8}  {'P99 ms':>8}  {'Max ms':>8}")
+    print("-" * (width + 68))
+    for target, target_windows in windows.items():
+        for name, stats in target_windows.summary().items():
+            if 'average' in stats:
+                values = f"{stats['average']:>8.2f}  {stats['p50']:>8.2f}  {stats['p99']:>8.2f}  {stats['max']:>8.2f}"
+            else:
+                values = f"{'-':>8}  {'-':>8}  {'-':>8}  {'-':>8}"
+            print(f"{target:<{width}}  {name:>6}  {stats['sent']:>6}  {stats['packet_loss']:>6.2f}%  {values}")
+            target = ""
+        # Summaries of many targets are spread out so replies keep being read on time
+        await asyncio.sleep(0)
+    print()
+
+
+async def report_windows(windows, report_interval, stop):
+    """Print the rolling windows every report_interval seconds while the probes keep running."""
+    start_time = time.monotonic()
+    reports = 0
+    while True:
+        reports += 1
+        if await wait_stop(stop, start_time + reports * report_interval - time.monotonic()):
+            return
+        await print_windows(windows)
+
+
+async def monitor_targets(targets, duration_minutes, verbose, max_concurrent, engine, ping_interval=1, daemon=False,
+                          report_interval=DEFAULT_REPORT_INTERVAL):
+    stop = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops have no signal handlers, Ctrl+C still ends the run
+            pass
+
+    icmp = None
+    if engine == 'native':
+        try:
+            icmp = IcmpSocketEngine()
+        except OSError as e:
+            print(f"Unprivileged ICMP sockets are not available ({e}), check net.ipv4.ping_group_range. "
+                  f"Using the {DEFAULT_ENGINE} engine.\n")
+            engine = DEFAULT_ENGINE
+
+    slots = asyncio.Semaphore(max_concurrent)
+    # Deadline on the monotonic clock, a daemon without --duration runs until stopped
+    end_time = time.monotonic() + duration_minutes * 60 if duration_minutes is not None else None
+    show_target = len(targets) > 1
+    windows = {target: RollingWindows(ping_interval) for target in targets} if daemon else {}
+
+    def samples(index, target):
+        # Targets start spread over the first interval, not all in the same instant
+        offset = index * ping_interval / len(targets)
+        if engine == 'native':
+            return native_samples(icmp, target, offset, end_time, ping_interval, stop)
+        if engine == 'persistent':
+            return persistent_samples(target, offset, end_time, ping_interval, stop)
+        return oneshot_samples(target, offset, end_time, ping_interval, stop, slots)
+
+    reporter = asyncio.create_task(report_windows(windows, report_interval, stop)) if daemon else None
+    try:
+        results = await asyncio.gather(*(
+            probe_target(target, samples(index, target), end_time, verbose, show_target, windows.get(target))
+            for index, target in enumerate(targets)
+        ))
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        if icmp is not None:
+            icmp.close()
+    if stop.is_set():
+        print("\n\nMonitoring interrupted by user.")
+    if daemon:
+        await print_windows(windows)
+    return dict(zip(targets, results))
+
+
+def monitor_latency(source, targets, duration_minutes=1, verbose=False, max_concurrent=DEFAULT_MAX_CONCURRENT, engine=DEFAULT_ENGINE,
+                    ping_interval=1, daemon=False, report_interval=DEFAULT_REPORT_INTERVAL):
+    """Monitor every target concurrently and return their statistics keyed by target."""
+    duration = f"for {duration_minutes:g} minute(s)" if duration_minutes is not None else "until stopped"
+    if len(targets) == 1:
+        print(f"Monitoring latency from {source} to {targets[0]} {duration}...")
+    else:
+        print(f"Monitoring latency from {source} to {len(targets)} targets {duration}...")
     print(f"Starting at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
+
     if verbose:
         print(f"Platform: {sys.platform}")
-        print(f"Ping interval: 1 second")
-        print(f"Expected pings: ~{duration_minutes * 60}")
+        print(f"Ping interval: {ping_interval:g} second(s)")
+        if duration_minutes is not None:
+            print(f"Expected pings: ~{int(duration_minutes * 60 / ping_interval)} per target")
+        if daemon:
+            print(f"Rolling windows: {', '.join(WINDOWS)}, reported every {report_interval:g} second(s)")
+        print(f"Probe engine: {engine}")
+        if engine == 'oneshot':
+            print(f"Concurrent pings: up to {min(max_concurrent, len(targets))}")
+        elif engine == 'persistent':
+            print(f"Ping processes: {len(targets)}")
         print("-" * 60 + "\n")
-    
-    latencies = []
-    failed_pings = 0
-    start_time = time.time()
-    end_time = start_time + (duration_minutes * 60)
-    ping_interval = 1  # Ping every 1 second
-    
-    # Track running statistics for verbose mode
-    running_avg = 0
-    running_min = float('inf')
-    running_max = 0
-    
+
     try:
-        while time.time() < end_time:
-            ping_start = time.time()
-            latency = ping_host(target)
-            ping_duration = time.time() - ping_start
-            
-            if latency is not None:
-                latencies.append(latency)
-                running_avg = mean(latencies)
-                running_min = min(running_min, latency)
-                running_max = max(running_max, latency)
-                
-                if verbose:
-                    time_remaining = int(end_time - time.time())
-                    print(f"[{len(latencies):4d}] {time.strftime('%H:%M:%S')} | "
-                          f"Latency: {latency:6.2f} ms | "
-                          f"Avg: {running_avg:6.2f} ms | "
-                          f"Min: {running_min:6.2f} ms | "
-                          f"Max: {running_max:6.2f} ms | "
-                          f"Remaining: {time_remaining:3d}s")
-                else:
-                    None
-            else:
-                failed_pings += 1
-                if verbose:
-                    time_remaining = int(end_time - time.time())
-                    print(f"[{len(latencies) + failed_pings:4d}] {time.strftime('%H:%M:%S')} | "
-                          f"Ping FAILED (timeout: {ping_duration:.2f}s) | "
-                          f"Remaining: {time_remaining:3d}s")
-                else:
-                    print(f"[{len(latencies) + failed_pings}] Ping failed (timeout or unreachable)")
-            
-            # Wait for next ping, accounting for time spent pinging
-            elapsed = time.time() - start_time
-            next_ping = start_time + (len(latencies) + failed_pings) * ping_interval
-            sleep_time = max(0, next_ping - time.time())
-            time.sleep(sleep_time)
-    
+        return asyncio.run(monitor_targets(targets, duration_minutes, verbose, max_concurrent, engine, ping_interval, daemon, report_interval))
     except KeyboardInterrupt:
         print("\n\nMonitoring interrupted by user.")
-    
-    # Calculate statistics
-    if latencies:
-        stats = {
-            'average': mean(latencies),
-            'min': min(latencies),
-            'max': max(latencies),
-            'std_dev': stdev(latencies) if len(latencies) > 1 else 0,
-            'total_pings': len(latencies) + failed_pings,
-            'successful_pings': len(latencies),
-            'failed_pings': failed_pings,
-            'packet_loss': (failed_pings / (len(latencies) + failed_pings)) * 100
-        }
-        return stats
+        return {target: None for target in targets}
+
+
+def print_target_statistics(source, target, duration, stats):
+    if stats and stats['successful_pings']:
+        print(f"Source Node:        {source}")
+        print(f"Target Node:        {target}")
+        print(f"Duration:           {duration}")
+        print(f"\nTotal Pings:        {stats['total_pings']}")
+        print(f"Successful:         {stats['successful_pings']}")
+        print(f"Failed:             {stats['failed_pings']}")
+        print(f"Packet Loss:        {stats['packet_loss']:.2f}%")
+        print(f"\nAverage Latency:    {stats['average']:.2f} ms")
+        print(f"Minimum Latency:    {stats['min']:.2f} ms")
+        print(f"Maximum Latency:    {stats['max']:.2f} ms")
+        print(f"Std Deviation:      {stats['std_dev']:.2f} ms")
+        print(f"\nP50 Latency:        {stats['p50']:.2f} ms")
+        print(f"P90 Latency:        {stats['p90']:.2f} ms")
+        print(f"P99 Latency:        {stats['p99']:.2f} ms")
+        print(f"P99.9 Latency:      {stats['p99_9']:.2f} ms")
     else:
-        return None
+        print("No successful pings recorded.")
+        print(f"Target {target} may be unreachable or blocking ICMP packets.")
+
+
+def print_summary_table(source, duration, results):
+    print(f"Source Node:        {source}")
+    print(f"Duration:           {duration}")
+    print(f"Targets:            {len(results)}\n")
+
+    width = max(len('Target'), *(len(target) for target in results))
+    print(f"{'Target':<{width}}  {'Sent':>6}  {'Recv':>6}  {'Loss':>7}  {'Avg ms':>8}  {'Min ms':>8}  {'Max ms':>8}  {'StdDev':>8}  {'P50 ms':>8}  {'P99 ms':>8}")
+    print("-" * (width + 88))
+    unreachable = 0
+    for target, stats in results.items():
+        if stats and stats['successful_pings']:
+            print(f"{target:<{width}}  {stats['total_pings']:>6}  {stats['successful_pings']:>6}  {stats['packet_loss']:>6.2f}%  "
+                  f"{stats['average']:>8.2f}  {stats['min']:>8.2f}  {stats['max']:>8.2f}  {stats['std_dev']:>8.2f}  "
+                  f"{stats['p50']:>8.2f}  {stats['p99']:>8.2f}")
+        else:
+            unreachable += 1
+            sent = stats['total_pings'] if stats else 0
+            print(f"{target:<{width}}  {sent:>6}  {0:>6}  {'100.00%':>7}" + f"  {'-':>8}" * 6)
+
+    if unreachable:
+        print(f"\n{unreachable} target(s) had no successful pings, they may be unreachable or blocking ICMP packets.")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Monitor network latency between two nodes',
+        description='Monitor network latency between a node and one or more targets',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -138,61 +743,125 @@ Examples:
   %(prog)s myserver 8.8.8.8 --duration 3
   %(prog)s router1 192.168.1.1 -d 5
   %(prog)s localhost 8.8.8.8 -d 3 --verbose
+  %(prog)s jumphost esx01.lab esx02.lab vcenter.lab
+  %(prog)s jumphost -f targets.txt -d 3
+  %(prog)s jumphost -f targets.txt -d 90 -i 0.5
+  %(prog)s site-a witness.site-b.lab --daemon -i 0.2 -e native
         """
     )
-    
+
     parser.add_argument(
         'source',
         help='Source node (local machine identifier)'
     )
-    
+
     parser.add_argument(
         'target',
-        help='Target node (hostname or IP address to ping)'
+        nargs='*',
+        help='Target nodes (hostnames or IP addresses to ping)'
     )
-    
+
+    parser.add_argument(
+        '-f', '--targets-file',
+        help='File with one target per line, added to the targets given on the command line'
+    )
+
     parser.add_argument(
         '-d', '--duration',
-        type=int,
-        choices=[1, 3, 5],
+        type=float,
+        help='Duration to monitor in minutes (default: 1, unlimited with --daemon)'
+    )
+
+    parser.add_argument(
+        '-i', '--interval',
+        type=float,
         default=1,
-        help='Duration to monitor in minutes (default: 1)'
+        help=f'Seconds between two pings of a target, at least {MIN_INTERVAL:g} (default: 1). '
+             'Linux ping only allows less than 0.2 to root, use the native engine for shorter intervals'
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help=f'Monitor until stopped with Ctrl+C or SIGTERM, or for --duration, and report {"/".join(WINDOWS)} '
+             'rolling window statistics periodically'
+    )
+
+    parser.add_argument(
+        '--report-interval',
+        type=float,
+        default=DEFAULT_REPORT_INTERVAL,
+        help=f'Seconds between two rolling window reports in daemon mode (default: {DEFAULT_REPORT_INTERVAL})'
+    )
+
+    parser.add_argument(
+        '-e', '--engine',
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help='persistent keeps one ping process per target, oneshot starts a ping process for every sample, '
+             'native sends ICMP echo requests itself on unprivileged ICMP sockets and falls back to '
+             f'{DEFAULT_ENGINE} where they are not permitted (default: {DEFAULT_ENGINE})'
+    )
+
+    parser.add_argument(
+        '--max-concurrent',
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT,
+        help=f'Maximum ping processes running at the same time with the oneshot engine (default: {DEFAULT_MAX_CONCURRENT})'
     )
-    
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
         help='Enable verbose mode with detailed real-time statistics'
     )
-    
+
     args = parser.parse_args()
-    
+
+    targets = list(args.target)
+    if args.targets_file:
+        try:
+            targets.extend(read_targets_file(args.targets_file))
+        except OSError as e:
+            parser.error(f"cannot read targets file: {e}")
+    # Each target is probed once, in the order given
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        parser.error("at least one target is required, on the command line or with --targets-file")
+    if args.max_concurrent < 1:
+        parser.error("--max-concurrent must be at least 1")
+    if args.interval < MIN_INTERVAL:
+        parser.error(f"--interval must be at least {MIN_INTERVAL:g} second")
+    if args.duration is not None and args.duration <= 0:
+        parser.error("--duration must be greater than 0")
+    if args.report_interval <= 0:
+        parser.error("--report-interval must be greater than 0")
+    if args.duration is None and not args.daemon:
+        args.duration = 1
+    if args.engine == 'persistent' and sys.platform.startswith('win'):
+        parser.error("the persistent engine needs the numbered replies of Linux or macOS ping, use --engine oneshot")
+
     # Run monitoring
-    stats = monitor_latency(args.source, args.target, args.duration, args.verbose)
-    
+    start_time = time.monotonic()
+    results = monitor_latency(args.source, targets, args.duration, args.verbose, args.max_concurrent, args.engine,
+                              args.interval, args.daemon, args.report_interval)
+    if args.duration is not None:
+        duration = f"{args.duration:g} minute(s)"
+    else:
+        duration = f"{(time.monotonic() - start_time) / 60:.1f} minute(s), until stopped"
+
     # Display results
     print("\n" + "=" * 60)
     print("LATENCY STATISTICS")
     print("=" * 60)
-    
-    if stats:
-        print(f"Source Node:        {args.source}")
-        print(f"Target Node:        {args.target}")
-        print(f"Duration:           {args.duration} minute(s)")
-        print(f"\nTotal Pings:        {stats['total_pings']}")
-        print(f"Successful:         {stats['successful_pings']}")
-        print(f"Failed:             {stats['failed_pings']}")
-        print(f"Packet Loss:        {stats['packet_loss']:.2f}%")
-        print(f"\nAverage Latency:    {stats['average']:.2f} ms")
-        print(f"Minimum Latency:    {stats['min']:.2f} ms")
-        print(f"Maximum Latency:    {stats['max']:.2f} ms")
-        print(f"Std Deviation:      {stats['std_dev']:.2f} ms")
+
+    if len(targets) == 1:
+        print_target_statistics(args.source, targets[0], duration, results[targets[0]])
     else:
-        print("No successful pings recorded.")
-        print(f"Target {args.target} may be unreachable or blocking ICMP packets.")
-    
+        print_summary_table(args.source, duration, results)
+
     print("=" * 60)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()